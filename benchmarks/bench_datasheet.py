@@ -0,0 +1,102 @@
+"""
+Benchmark keeco_datasheet.clean_price_list against the row-wise legacy cleaning.
+
+Builds a synthetic price list shaped like the "keeco" sheet (text columns
+with ™/® symbols and stray whitespace, sparse specs columns, numeric case
+columns, mixed text/number cells, blank rows and duplicates), cleans it with
+both implementations, checks the results are identical and prints the time
+each took.
+
+Usage:
+    python benchmarks/bench_datasheet.py [--rows N] [--seed S]
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import legacy_datasheet as legacy  # noqa: E402
+from keeco_datasheet import clean_price_list  # noqa: E402
+
+CATEGORIES = ["Pillows", "Comforters", "Mattress Pads", "Sheets", "Bath", "Shower Curtains"]
+COLLECTIONS = ["Simple Comfort™", "Hotel Collection®", " Sleep & Beyond", "Essentials ", "Luxe™ Down Alternative"]
+SIZE_TYPES = ["Bed", "Pillow", "Towel", None]
+SIZES = ["Standard", "Queen", "King", "Twin", "Full", "Cal King", 20, 27.5, "20 x 26"]
+MATERIALS = ["100% Polyester", "Cotton Blend®", "Microfiber™ ", "Linen", None]
+EDGES = ["Corded", "Piped", "Hemmed", None, None]
+TREATMENTS = ["Stain Release", "Antimicrobial™", None, None, None]
+QUILTING = ["Box Stitch", "Channel", None, None, None]
+FEATURES = ["Hookless®", "Zippered", "Bed bug proof", None, None, None]
+
+
+def synthetic_price_list(rows, seed):
+    rng = np.random.default_rng(seed)
+
+    def pick(choices):
+        return np.array(choices, dtype=object)[rng.integers(0, len(choices), rows)]
+
+    thread_count = rng.choice([200.0, 300.0, 400.0, 600.0, np.nan], rows)
+    df = pd.DataFrame({
+        "Category": pick(CATEGORIES),
+        "Sub Category": pick(["Standard", "Premium™", "Value "]),
+        "Collection": pick(COLLECTIONS),
+        "SKU": [f"KE-{number:07d}" for number in range(rows)],
+        "Size Type": pick(SIZE_TYPES),
+        "Size": pick(SIZES),
+        "Fill Weight": pick(["20 oz", "24 oz", "1.5 lbs", None]),
+        "Thread Count / GSM": thread_count,
+        "Materal ": pick(MATERIALS),
+        "Edge Designs": pick(EDGES),
+        "Fabric Treatments": pick(TREATMENTS),
+        "Quilting Designs": pick(QUILTING),
+        "Specialized Features": pick(FEATURES),
+        "Case Length": rng.uniform(10, 40, rows).round(2),
+        "Case Width": pick([12, 14.5, "16", "n/a"]),
+        "Case Height": rng.uniform(5, 20, rows).round(1),
+        "Case Pack": pick([1, 2, 4, 6, 12, None]),
+        "Price Each (FOB Plant)": rng.uniform(2, 150, rows).round(2),
+        "Liner (Yes or No)": pick(["Yes", "No", "yes", "NO", None]),
+    })
+    # Blank rows, an empty column and exact duplicates, as in exported sheets
+    blanks = rng.choice(rows, rows // 100, replace=False)
+    df.loc[blanks] = None
+    df["Notes"] = None
+    return pd.concat([df, df.iloc[: rows // 200]], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    df = synthetic_price_list(args.rows, args.seed)
+    print(f"Synthetic price list: {len(df)} rows x {len(df.columns)} columns")
+
+    with warnings.catch_warnings():
+        # The legacy code relies on the deprecated DataFrame.applymap
+        warnings.simplefilter("ignore", FutureWarning)
+        start = time.perf_counter()
+        expected = legacy.clean_price_list(df.copy())
+        legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = clean_price_list(df.copy())
+    current_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(actual, expected)
+    print("Output: identical to the legacy cleaning\n")
+    print(f"legacy   {legacy_seconds:8.2f} s")
+    print(f"current  {current_seconds:8.2f} s  ({legacy_seconds / current_seconds:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
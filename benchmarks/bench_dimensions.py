@@ -0,0 +1,139 @@
+"""
+Randomized equivalence checks and a long-input benchmark for extract_dimensions.
+
+The checks generate random dimension strings and assert that:
+  - text with at most one size label parses exactly as the legacy parser did;
+  - every size section is labelled with the size that introduces it, including
+    when two sections have identical text (the legacy parser re-searched the
+    text before each section and always found the first size label);
+  - splitting into sections loses or reorders no dimensions.
+
+The benchmark then times both parsers on strings with many size sections.
+
+Usage:
+    python benchmarks/bench_dimensions.py [--cases N] [--seed S]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import legacy_parsers as legacy  # noqa: E402
+from keeco_cleaning import extract_dimensions  # noqa: E402
+
+SIZES = ["Standard", "Queen", "King", "Twin", "Full", "Cal King", "California King"]
+SEPARATORS = [": ", " - ", " ", ":", "-\n"]
+UNITS = ['"', " in", " inches", "'", ""]
+JOINERS = ["; ", ", ", "\n", " "]
+
+
+def random_number(rng):
+    choice = rng.random()
+    if choice < 0.6:
+        return str(rng.randint(1, 120))
+    if choice < 0.8:
+        return f"{rng.randint(1, 120)}.{rng.randint(0, 99)}"
+    return f"{rng.randint(1, 120)}{rng.choice([' ', '-', ' - '])}{rng.randint(1, 7)}/8"
+
+
+def random_dimension(rng):
+    unit = rng.choice(UNITS)
+    parts = [random_number(rng) + unit for _ in range(rng.choice([2, 2, 3]))]
+    if rng.random() < 0.1:
+        return f"L: {parts[0]} W: {parts[1]}"
+    return rng.choice([" x ", "x", " X "]).join(parts)
+
+
+def random_section(rng):
+    """Text of one size section: one or more dimensions, never a size label."""
+    return rng.choice(JOINERS[:2]).join(random_dimension(rng) for _ in range(rng.randint(1, 2)))
+
+
+def random_sized_text(rng, sections):
+    """Return (text, [(size, section), ...]) for a string of labelled sections."""
+    labelled = []
+    chunks = []
+    for _ in range(sections):
+        size = rng.choice(SIZES)
+        section = random_section(rng)
+        labelled.append((size, section))
+        chunks.append(size + rng.choice(SEPARATORS) + section)
+    return rng.choice(JOINERS).join(chunks), labelled
+
+
+def expected_output(labelled):
+    """Output for labelled sections, each section parsed on its own by the legacy parser."""
+    dimensions = []
+    for size, section in labelled:
+        processed = legacy.extract_dimensions(section)
+        if processed:
+            dimensions.append(f"{size}: {processed}")
+    return "; ".join(dimensions)
+
+
+def check(cases, seed):
+    rng = random.Random(seed)
+    failures = 0
+
+    def report(kind, text, expected, actual):
+        nonlocal failures
+        failures += 1
+        if failures <= 10:
+            print(f"FAIL ({kind}) {text!r}\n  expected: {expected!r}\n  actual:   {actual!r}")
+
+    for _ in range(cases):
+        # Unlabelled and single-size text: identical to the legacy parser
+        text = random_section(rng)
+        if rng.random() < 0.5:
+            text, _ = random_sized_text(rng, 1)
+        if rng.random() < 0.2:
+            text = rng.choice(["Fits most beds ", "Approx. ", ""]) + text
+        expected, actual = legacy.extract_dimensions(text), extract_dimensions(text)
+        if expected != actual:
+            report("single", text, expected, actual)
+
+        # Multi-size text: each section carries the size that introduces it
+        text, labelled = random_sized_text(rng, rng.randint(2, 8))
+        if rng.random() < 0.3:
+            # Repeat a section's text under another size
+            size, section = labelled[-1]
+            labelled.append((rng.choice(SIZES), section))
+            text += "; " + labelled[-1][0] + ": " + section
+        expected = expected_output(labelled)
+        actual = extract_dimensions(text)
+        if expected != actual:
+            report("multi", text, expected, actual)
+
+    print(f"Randomized checks: {failures} failures in {cases * 2} inputs (seed {seed})")
+    return failures
+
+
+def benchmark(seed):
+    rng = random.Random(seed)
+    print(f"\n{'sections':>8}{'legacy ms/call':>16}{'current ms/call':>17}{'speedup':>9}")
+    for sections in (10, 100, 1000):
+        text, _ = random_sized_text(rng, sections)
+        number = max(1, 2000 // sections)
+        before = min(timeit.repeat(lambda: legacy.extract_dimensions(text), number=number, repeat=3)) / number
+        after = min(timeit.repeat(lambda: extract_dimensions(text), number=number, repeat=3)) / number
+        print(f"{sections:>8}{before * 1e3:>16.3f}{after * 1e3:>17.3f}{before / after:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=5000, help="random inputs per check")
+    parser.add_argument("--seed", type=int, default=12)
+    args = parser.parse_args()
+
+    failures = check(args.cases, args.seed)
+    benchmark(args.seed)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+End-to-end extraction benchmark on the offline HTML corpus.
+
+Starts fixture_server.FixtureServer at each catalog scale (1x, 10x, 100x of
+the corpus by default) and, in a fresh process per scale, runs the scraper's
+hot paths against it:
+  - crawl:    page through every category listing and fetch every product
+              page over HTTP, as the http fetch backend does;
+  - extract:  keeco_scraper.extract_product_html on each product page (the
+              parsing scrape_product_page does on driver.page_source);
+  - clean:    keeco_cleaning.clean_product on each extracted record, plus
+              each cleaning function timed alone on the arguments it was
+              called with during that pass;
+  - csv:      keeco_scraper.save_to_csv of the cleaned products;
+  - db:       with --db, keeco_db.upsert_rows of the CSV rows into a
+              temporary manufactured.keeco-shaped table (DB_* settings from
+              the environment or .env).
+It reports pages/s, rows/s and the peak RSS of each scale's process.
+
+Usage:
+    python benchmarks/bench_e2e.py [--scales 1 10 100] [--db]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from urllib.parse import urljoin
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+# Cleaning functions timed on their own; attach_variant_details includes the
+# clean_dimensions, merge_fill_weights and clean_text calls it makes
+CLEANING_FUNCTIONS = [
+    "clean_text", "clean_type_size", "standardize_case_info",
+    "attach_variant_details", "clean_dimensions", "merge_fill_weights",
+]
+
+BENCH_TABLE = "keeco_bench"
+CREATE_BENCH_TABLE = f"""
+CREATE TEMP TABLE {BENCH_TABLE} (
+    category VARCHAR(100),
+    parent_name VARCHAR(255),
+    sku VARCHAR(100) UNIQUE NOT NULL,
+    type_size VARCHAR(100),
+    price_per_unit DECIMAL(10,2),
+    units_per_case INTEGER,
+    specs JSONB,
+    row_hash CHAR(32)
+)
+"""
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def crawl(server, page_size=24):
+    """Fetch every listing and product page; return (product pages, pages fetched)."""
+    import lxml.html
+    import requests
+    from keeco_scraper import PRODUCT_LINK_XPATH, category_page_url
+
+    session = requests.Session()
+    pages = []
+    fetched = 0
+    for category in server.categories():
+        page = 0
+        while True:
+            response = session.get(category_page_url(category["url"], page, page_size))
+            fetched += 1
+            tree = lxml.html.fromstring(response.text)
+            links = [urljoin(response.url, a.get("href")) for a in tree.xpath(PRODUCT_LINK_XPATH)]
+            for link in links:
+                product = session.get(link)
+                fetched += 1
+                pages.append((category["name"], link, product.text))
+            next_buttons = tree.cssselect(".pagination .next")
+            if not links or not next_buttons or "disabled" in (next_buttons[0].get("class") or ""):
+                break
+            page += 1
+    session.close()
+    return pages, fetched
+
+
+def record_calls(module, names):
+    """Wrap module functions so every call's arguments are recorded; returns (calls, restore)."""
+    calls = defaultdict(list)
+    originals = {name: getattr(module, name) for name in names}
+
+    def recorder(name, func):
+        def wrapper(*args):
+            calls[name].append(args)
+            return func(*args)
+        return wrapper
+
+    for name, func in originals.items():
+        setattr(module, name, recorder(name, func))
+
+    def restore():
+        for name, func in originals.items():
+            setattr(module, name, func)
+
+    return calls, restore
+
+
+def time_function(module, name, calls):
+    """Seconds to replay the recorded calls of one cleaning function."""
+    import copy
+
+    from keeco_text import normalizer
+
+    func = getattr(module, name)
+    if name == "attach_variant_details":
+        # It writes into the rows it is given; time it on fresh copies
+        calls = [copy.deepcopy(args) for args in calls]
+    if name == "clean_text":
+        # Start from an empty memo, as a crawl does
+        normalizer._memo.cache_clear()
+    start = time.perf_counter()
+    for args in calls:
+        func(*args)
+    return time.perf_counter() - start
+
+
+def load_db(rows):
+    """Upsert the CSV rows into a temporary table; returns seconds taken."""
+    from dotenv import load_dotenv
+
+    from keeco_db import upsert_rows
+    from keeco_scraper import db_row, get_db_connection
+
+    load_dotenv()
+    data = [db_row(row) for row in rows]
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(CREATE_BENCH_TABLE)
+        start = time.perf_counter()
+        upsert_rows(conn, BENCH_TABLE, data, conflict_column="sku")
+        seconds = time.perf_counter() - start
+        conn.rollback()
+    finally:
+        conn.close()
+    return seconds
+
+
+def run_scale(scale, use_db):
+    """Run every stage at one scale in this process and return its measurements."""
+    import keeco_cleaning
+    from fixture_server import FixtureServer
+    from keeco_scraper import extract_product_html, product_rows, save_to_csv
+
+    result = {"scale": scale}
+    with FixtureServer(scale=scale) as server:
+        start = time.perf_counter()
+        pages, fetched = crawl(server)
+        result["crawl_s"] = time.perf_counter() - start
+        result["pages_fetched"] = fetched
+    result["products"] = len(pages)
+
+    start = time.perf_counter()
+    records = []
+    for category, url, page in pages:
+        record = extract_product_html(url, page)
+        record["category"] = category
+        records.append(record)
+    result["extract_s"] = time.perf_counter() - start
+    del pages
+
+    calls, restore = record_calls(keeco_cleaning, CLEANING_FUNCTIONS)
+    try:
+        products = [keeco_cleaning.clean_product(record) for record in records]
+    finally:
+        restore()
+    start = time.perf_counter()
+    products = [keeco_cleaning.clean_product(record) for record in records]
+    result["clean_s"] = time.perf_counter() - start
+    result["functions"] = {
+        name: {"calls": len(calls[name]), "seconds": time_function(keeco_cleaning, name, calls[name])}
+        for name in CLEANING_FUNCTIONS
+    }
+    images = [(product["images"],) for product in products]
+    result["functions"]["clean_image_urls"] = {
+        "calls": len(images), "seconds": time_function(keeco_cleaning, "clean_image_urls", images),
+    }
+    del calls
+
+    rows = [row for product in products for row in product_rows(product)]
+    result["rows"] = len(rows)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "products.csv")
+        start = time.perf_counter()
+        save_to_csv(products, path)
+        result["csv_s"] = time.perf_counter() - start
+
+    if use_db:
+        result["db_s"] = load_db(rows)
+
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def rate(count, seconds):
+    return f"{count / seconds:,.0f}" if seconds else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--db", action="store_true", help="also time the database load (needs DB_* settings)")
+    parser.add_argument("--scale", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scale:
+        # Child process: measure one scale and report as JSON on the last line
+        print(json.dumps(run_scale(args.scale, args.db)))
+        return
+
+    results = []
+    for scale in args.scales:
+        command = [sys.executable, __file__, "--scale", str(scale)] + (["--db"] if args.db else [])
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+
+    print(f"{'scale':>6}{'products':>10}{'rows':>8}{'crawl p/s':>11}{'extract p/s':>13}"
+          f"{'clean p/s':>11}{'clean r/s':>11}{'csv r/s':>10}{'db r/s':>9}{'peak RSS MB':>13}")
+    for r in results:
+        print(f"{str(r['scale']) + 'x':>6}{r['products']:>10}{r['rows']:>8}"
+              f"{rate(r['pages_fetched'], r['crawl_s']):>11}{rate(r['products'], r['extract_s']):>13}"
+              f"{rate(r['products'], r['clean_s']):>11}{rate(r['rows'], r['clean_s']):>11}"
+              f"{rate(r['rows'], r['csv_s']):>10}{rate(r['rows'], r.get('db_s', 0)):>9}{r['peak_rss_mb']:>13.0f}")
+
+    print(f"\n{'function (us/call)':<24}" + "".join(f"{str(r['scale']) + 'x':>10}" for r in results))
+    for name in CLEANING_FUNCTIONS + ["clean_image_urls"]:
+        cells = []
+        for r in results:
+            stats = r["functions"][name]
+            cells.append(f"{stats['seconds'] / stats['calls'] * 1e6:>10.2f}" if stats["calls"] else f"{'-':>10}")
+        print(f"{name:<24}" + "".join(cells))
+
+    # Every catalog copy must be crawled, extracted and cleaned in full
+    consistent = len({(r["products"] / r["scale"], r["rows"] / r["scale"]) for r in results}) == 1
+    sys.exit(0 if consistent else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Compare whole-sheet and streaming (chunked) price list ingestion.
+
+Writes the synthetic price list from bench_datasheet.py to an .xlsx file,
+then reads and cleans it in a fresh process per mode:
+  - whole:  pd.read_excel + clean_price_list, as keeco_datasheet.py does by default;
+  - stream: keeco_datasheet.clean_chunks with --chunk-rows rows per chunk;
+  - cached: keeco_datasheet.load_sheet with a fresh SheetCache, run twice so
+    the first run parses and fills the cache and the second reads it back.
+For each mode it prints the time until the first cleaned rows are ready, the
+total time and the peak RSS of the process. The database load is left out so
+the numbers only cover parsing and cleaning, but every mode must produce the
+rows the load would write: the keeco_db.row_hash of each SKU's row (the last
+one, as the upsert keeps) must match across modes.
+
+Usage:
+    python benchmarks/bench_ingest.py [--rows N] [--chunk-rows N] [--workbook PATH]
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+SHEET = "keeco"
+
+
+def write_workbook(path, rows, seed):
+    from openpyxl import Workbook
+    from bench_datasheet import synthetic_price_list
+
+    df = synthetic_price_list(rows, seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(SHEET)
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        sheet.append([None if value != value else value for value in row])
+    workbook.save(path)
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def add_row_hashes(hashes, df):
+    """Record the row_hash of each cleaned row under its SKU (later rows win); returns seconds taken."""
+    from keeco_datasheet import prepare_rows
+    from keeco_db import row_hash
+
+    start = time.perf_counter()
+    for row in prepare_rows(df):
+        hashes[str(row["sku"])] = row_hash(row.values())
+    return time.perf_counter() - start
+
+
+def rows_digest(hashes):
+    return hashlib.md5(json.dumps(sorted(hashes.items())).encode("utf-8")).hexdigest()
+
+
+def run_mode(mode, path, chunk_rows):
+    """Ingest the workbook in this process and return its measurements."""
+    import pandas as pd
+    from keeco_datasheet import clean_chunks, clean_price_list, load_sheet
+    from keeco_sheet_cache import SheetCache
+
+    start = time.perf_counter()
+    first = None
+    rows = 0
+    # Hashing is only for the consistency check; its time is not counted
+    hashes = {}
+    hashing = 0.0
+    if mode == "whole":
+        df = clean_price_list(pd.read_excel(path, sheet_name=SHEET))
+        first = time.perf_counter() - start
+        rows = len(df)
+        hashing += add_row_hashes(hashes, df)
+    elif mode == "cached":
+        cache = SheetCache(os.path.join(tempfile.gettempdir(), "keeco_bench_cache"))
+        df = clean_price_list(load_sheet(path, SHEET, cache))
+        first = time.perf_counter() - start
+        rows = len(df)
+        hashing += add_row_hashes(hashes, df)
+    else:
+        for df in clean_chunks(path, SHEET, chunk_rows):
+            if first is None:
+                first = time.perf_counter() - start
+            rows += len(df)
+            hashing += add_row_hashes(hashes, df)
+    total = time.perf_counter() - start - hashing
+    return {"rows": rows, "first": first, "total": total, "peak_rss_mb": peak_rss_mb(),
+            "skus": len(hashes), "digest": rows_digest(hashes)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--chunk-rows", type=int, default=10_000)
+    parser.add_argument("--workbook", help="workbook to write (or reuse if it exists)")
+    parser.add_argument("--mode", choices=("whole", "stream", "cached"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    path = args.workbook or os.path.join(tempfile.gettempdir(), f"keeco_price_list_{args.rows}_{args.seed}.xlsx")
+    if args.mode:
+        # Child process: measure one mode and report as JSON
+        print(json.dumps(run_mode(args.mode, path, args.chunk_rows)))
+        return
+
+    if not os.path.exists(path):
+        print(f"Writing {path} ...")
+        write_workbook(path, args.rows, args.seed)
+
+    print(f"{'mode':<8}{'rows':>10}{'first rows s':>14}{'total s':>10}{'peak RSS MB':>13}")
+    shutil.rmtree(os.path.join(tempfile.gettempdir(), "keeco_bench_cache"), ignore_errors=True)
+    results = {}
+    for label, mode in (("whole", "whole"), ("stream", "stream"), ("miss", "cached"), ("hit", "cached")):
+        output = subprocess.run(
+            [sys.executable, __file__, "--workbook", path, "--chunk-rows", str(args.chunk_rows), "--mode", mode],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[label] = result = json.loads(output.splitlines()[-1])
+        print(f"{label:<8}{result['rows']:>10}{result['first']:>14.2f}{result['total']:>10.2f}"
+              f"{result['peak_rss_mb']:>13.0f}")
+
+    # Streaming keeps rows duplicated across chunks (the upsert drops them), so it can only have more
+    consistent = (results["stream"]["rows"] >= results["whole"]["rows"]
+                  and results["hit"]["rows"] == results["whole"]["rows"])
+    for label in ("stream", "miss", "hit"):
+        if results[label]["digest"] != results["whole"]["digest"]:
+            print(f"{label}: cleaned rows differ from the whole-sheet load "
+                  f"({results[label]['skus']} vs {results['whole']['skus']} SKUs)")
+            consistent = False
+    sys.exit(0 if consistent else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark for the detail parsers in keeco_cleaning.
+
+Runs every parser over the detail-string corpus in benchmarks/corpus, checks
+that the output matches the legacy per-call-regex implementation, and prints
+the per-call cost before and after. parse_details_by_variant is covered by
+bench_variant_details.py.
+
+Usage:
+    python benchmarks/bench_parsers.py [--repeat N]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import keeco_cleaning as current  # noqa: E402
+import legacy_parsers as legacy  # noqa: E402
+from keeco_patterns import SIZE_LABELS  # noqa: E402
+
+CORPUS_PATH = os.path.join(HERE, "corpus", "detail_strings.json")
+
+# The legacy extract_dimensions labelled every size section with the first size
+# in the text; for these parsers, outputs are compared without their size labels
+# (bench_dimensions.py checks the labels themselves)
+SIZE_LABELS_FIXED = {"extract_dimensions", "clean_shipping_info", "standardize_shipping_info"}
+SECTION_LABEL = re.compile(rf"\b(?:{SIZE_LABELS}): ")
+
+
+def without_size_labels(output):
+    if isinstance(output, tuple):
+        return tuple(without_size_labels(item) for item in output)
+    return SECTION_LABEL.sub("", output)
+
+
+def load_cases(corpus):
+    """Build (parser name, argument tuples) pairs from the corpus."""
+    dimensions = corpus["dimensions"]
+    cartons = corpus["shipping_carton"]
+    shipping_weights = corpus["shipping_weight"]
+    fill_weights = corpus["fill_weight"]
+    return [
+        ("extract_dimensions", [(text,) for text in dimensions + cartons]),
+        ("clean_dimensions", [(text, carton) for text in dimensions for carton in cartons]),
+        ("merge_fill_weights", [(a, b) for a in fill_weights for b in fill_weights[:3]]),
+        ("clean_fill_weight", [(text,) for text in fill_weights]),
+        ("clean_type_size", [tuple(pair) for pair in corpus["type_size"]]),
+        ("clean_shipping_info", [(carton, weight) for carton in cartons for weight in shipping_weights]),
+        ("standardize_shipping_info", [(carton, weight) for carton in cartons for weight in shipping_weights]),
+        ("standardize_case_info", [(units,) for units in corpus["units_per_case"]]),
+        ("clean_image_urls", [(corpus["images"],)]),
+    ]
+
+
+def check_equivalence(cases):
+    mismatches = 0
+    for name, arg_list in cases:
+        for args in arg_list:
+            expected = getattr(legacy, name)(*args)
+            actual = getattr(current, name)(*args)
+            if name in SIZE_LABELS_FIXED:
+                expected, actual = without_size_labels(expected), without_size_labels(actual)
+            if expected != actual:
+                mismatches += 1
+                print(f"MISMATCH {name}{args!r}:\n  legacy:  {expected!r}\n  current: {actual!r}")
+    return mismatches
+
+
+def per_call_us(func, arg_list, repeat):
+    def run():
+        for args in arg_list:
+            func(*args)
+    # Best of three runs, to keep scheduler noise out of the numbers
+    best = min(timeit.repeat(run, number=repeat, repeat=3))
+    return best / (repeat * len(arg_list)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the corpus per timing run")
+    args = parser.parse_args()
+
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        cases = load_cases(json.load(f))
+
+    mismatches = check_equivalence(cases)
+    print(f"Equivalence: {mismatches} mismatches across "
+          f"{sum(len(arg_list) for _, arg_list in cases)} corpus inputs\n")
+
+    print(f"{'parser':<28}{'legacy us/call':>16}{'current us/call':>17}{'speedup':>9}")
+    for name, arg_list in cases:
+        before = per_call_us(getattr(legacy, name), arg_list, args.repeat)
+        after = per_call_us(getattr(current, name), arg_list, args.repeat)
+        print(f"{name:<28}{before:>16.2f}{after:>17.2f}{before / after:>8.2f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
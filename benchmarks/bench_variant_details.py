@@ -0,0 +1,103 @@
+"""
+Fixture check and benchmark for matching detail fields to table rows.
+
+corpus/variant_details.json holds products (raw details plus the cleaned
+type_size of each table row) and, per row, the details the old substring-scan
+matcher produced. That matcher walked size buckets created from a set, so for
+King and California King rows its answer depended on the hash seed; each row
+lists every outcome seen across 40 seeds, and the indexed matcher must produce
+one of them. Rows with an "expected" entry are ones the old matcher could not
+get right (see their "note") and must match that instead.
+
+Usage:
+    python benchmarks/bench_variant_details.py [--repeat N]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import legacy_parsers as legacy  # noqa: E402
+from keeco_cleaning import attach_variant_details, match_variant_details, parse_details_by_variant  # noqa: E402
+
+FIXTURE_PATH = os.path.join(HERE, "corpus", "variant_details.json")
+
+
+def attach(func, fixture):
+    table_data = [{"type_size": row["type_size"]} for row in fixture["rows"]]
+    func(table_data, fixture["raw_details"])
+    return [row["details"] for row in table_data]
+
+
+def legacy_match(fixture):
+    """Only the matching step of the legacy attach_variant_details."""
+    variant_details = legacy.parse_details_by_variant(fixture["raw_details"])
+    for row in fixture["rows"]:
+        type_size = row["type_size"]
+        for variant, details in variant_details.items():
+            if type_size.lower() in variant.lower() or variant.lower() in type_size.lower():
+                break
+
+
+def current_match(fixture):
+    variant_details = parse_details_by_variant(fixture["raw_details"])
+    for row in fixture["rows"]:
+        match_variant_details(variant_details, row["type_size"])
+
+
+def check(fixtures):
+    failures = 0
+    for number, fixture in enumerate(fixtures):
+        for row, details in zip(fixture["rows"], attach(attach_variant_details, fixture)):
+            if "expected" in row:
+                matches = details == row["expected"]
+            else:
+                matches = details in row["legacy_outcomes"]
+            if not matches:
+                failures += 1
+                print(f"MISMATCH fixture {number}, type_size {row['type_size']!r}:\n  actual: {details!r}")
+    rows = [row for fixture in fixtures for row in fixture["rows"]]
+    seed_dependent = sum(len(row["legacy_outcomes"]) > 1 for row in rows)
+    fixed = sum("expected" in row for row in rows)
+    print(f"Fixtures: {failures} mismatches in {len(rows)} rows of {len(fixtures)} products "
+          f"({seed_dependent} rows with seed-dependent legacy output, {fixed} fixed)")
+    return failures
+
+
+def best_us_per_row(func, fixtures, repeat):
+    rows = sum(len(fixture["rows"]) for fixture in fixtures)
+    seconds = min(timeit.repeat(lambda: [func(fixture) for fixture in fixtures], number=repeat, repeat=5))
+    return seconds / (repeat * rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the fixtures per timing run")
+    args = parser.parse_args()
+
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        fixtures = json.load(f)
+
+    failures = check(fixtures)
+
+    print(f"\n{'step':<16}{'legacy us/row':>15}{'current us/row':>16}{'speedup':>9}")
+    steps = (
+        ("match", legacy_match, current_match),
+        ("attach", lambda fixture: attach(legacy.attach_variant_details, fixture),
+         lambda fixture: attach(attach_variant_details, fixture)),
+    )
+    for name, before_func, after_func in steps:
+        before = best_us_per_row(before_func, fixtures, args.repeat)
+        after = best_us_per_row(after_func, fixtures, args.repeat)
+        print(f"{name:<16}{before:>15.2f}{after:>16.2f}{before / after:>8.2f}x")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
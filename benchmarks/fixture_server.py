@@ -0,0 +1,215 @@
+"""
+Local server that replays the HTML corpus as a keecohospitality.com stand-in.
+
+Serves the product pages in corpus/html (see make_html_corpus.py) under the
+same URL layout as the live site, renders category listing pages with the
+storefront's start/sz paging and .pagination .next link, and answers the
+login page with the form and customer-info header keeco_scraper waits for.
+
+The catalog can be scaled: with --scale N every product appears N times in
+its category (copies after the first get a "-c<copy>" URL and SKU suffix),
+so crawls can be timed at several catalog sizes from one corpus. Responses
+carry an ETag and honour If-None-Match, so conditional revalidation works
+as it does against the live site.
+
+Usage:
+    python benchmarks/fixture_server.py [--port 8000] [--scale N] [--latency MS]
+
+From Python:
+    with FixtureServer(scale=10) as server:
+        server.categories()   # [{"name": ..., "url": ...}, ...] like keeco_scraper.main()
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(HERE, "corpus", "html")
+
+PRODUCT_PATH = re.compile(r"^/(?P<category>[\w-]+)/(?P<slug>[\w-]+?)(?:-c(?P<copy>\d+))?\.html$")
+SKU_CELL = re.compile(r'(<td class="sku">)([^<]*)')
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Sign in | Keeco Hospitality</title></head>
+<body>
+<div id="header"><div class="content"><div class="customer-info">Signed in</div></div></div>
+<form class="login" onsubmit="return false">
+<input type="text" placeholder="email address">
+<input type="password" placeholder="password">
+<button class="sign-in-button" type="submit">Sign in</button>
+</form>
+</body></html>
+"""
+
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    """Return (manifest, {slug: page html}) for the corpus directory."""
+    with open(os.path.join(corpus_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    pages = {}
+    for category in manifest["categories"]:
+        for slug in category["products"]:
+            with open(os.path.join(corpus_dir, "products", slug + ".html"), encoding="utf-8") as f:
+                pages[slug] = f.read()
+    return manifest, pages
+
+
+def listing_page(category_name, product_urls, has_next):
+    tiles = "".join(
+        f'<li class="grid-tile"><div class="product-tile"><div class="product-name">'
+        f'<a class="name-link" href="{html.escape(url)}">Product</a></div></div></li>'
+        for url in product_urls
+    )
+    next_class = "next" if has_next else "next disabled"
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(category_name)} | Keeco Hospitality</title></head>
+<body>
+<div id="header"><div class="content"><div class="customer-info">Signed in</div></div></div>
+<div id="search-result-items"><ul>{tiles}</ul></div>
+<div class="pagination"><ul><li class="{next_class}"><a href="#">Next</a></li></ul></div>
+</body></html>
+"""
+
+
+class FixtureServer:
+    """Threaded HTTP server for the corpus, run in a background thread."""
+
+    def __init__(self, scale=1, port=0, latency=0.0, corpus_dir=CORPUS_DIR):
+        self.scale = scale
+        self.latency = latency
+        self.manifest, self.pages = load_corpus(corpus_dir)
+        self.categories_by_slug = {category["slug"]: category for category in self.manifest["categories"]}
+        self.requests = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def categories(self):
+        """Category list in the shape keeco_scraper.main() uses."""
+        return [
+            {"name": category["name"], "url": f"{self.base_url}/{category['slug']}/"}
+            for category in self.manifest["categories"]
+        ]
+
+    def product_urls(self, category_slug):
+        """Every product URL of a category at this scale, in listing order."""
+        slugs = self.categories_by_slug[category_slug]["products"]
+        return [
+            f"{self.base_url}/{category_slug}/{slug}{f'-c{copy}' if copy else ''}.html"
+            for copy in range(self.scale)
+            for slug in slugs
+        ]
+
+    def product_page(self, slug, copy):
+        page = self.pages[slug]
+        if copy:
+            # Keep SKUs unique across catalog copies
+            page = SKU_CELL.sub(lambda match: f"{match.group(1)}{match.group(2)}-c{copy}", page)
+        return page
+
+    def render(self, path, query):
+        """Return the page for a request path, or None if there is none."""
+        if path == "/home/FMI":
+            return LOGIN_PAGE
+        match = PRODUCT_PATH.match(path)
+        if match and match.group("slug") in self.pages:
+            copy = int(match.group("copy") or 0)
+            if copy < self.scale:
+                return self.product_page(match.group("slug"), copy)
+            return None
+        category_slug = path.strip("/")
+        if category_slug in self.categories_by_slug:
+            urls = self.product_urls(category_slug)
+            start = int(query.get("start", 0))
+            size = int(query.get("sz", 24))
+            return listing_page(self.categories_by_slug[category_slug]["name"],
+                                urls[start:start + size], start + size < len(urls))
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                parts = urlsplit(self.path)
+                page = server.render(parts.path, dict(parse_qsl(parts.query)))
+                if page is None:
+                    self.send_error(404)
+                    return
+                body = page.encode("utf-8")
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    body = b""
+                else:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    self.wfile.write(body)
+                with server.lock:
+                    server.requests += 1
+                    server.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--scale", type=int, default=1, help="copies of the catalog to serve")
+    parser.add_argument("--latency", type=float, default=0.0, help="milliseconds to wait before each response")
+    args = parser.parse_args()
+
+    server = FixtureServer(scale=args.scale, port=args.port, latency=args.latency / 1000)
+    products = sum(len(server.product_urls(category["slug"])) for category in server.manifest["categories"])
+    print(f"Serving {products} products in {len(server.manifest['categories'])} categories at {server.base_url}")
+    for category in server.categories():
+        print(f"  {category['name']}: {category['url']}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
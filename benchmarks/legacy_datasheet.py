@@ -0,0 +1,68 @@
+"""
+Frozen copy of keeco_datasheet.py's cleaning steps as they were before
+clean_price_list (row-wise apply for specs, applymap over every cell),
+wrapped in a function. bench_datasheet.py uses it as the "before" baseline
+and checks that clean_price_list produces the same values. Do not edit.
+"""
+import json
+import re
+
+import pandas as pd
+
+
+def clean_price_list(df):
+    # Cleaning and normalizing the data
+    # Step 1: Drop empty columns and rows
+    df = df.dropna(how='all', axis=0)
+    df = df.dropna(how='all', axis=1)
+
+    # Step 2: Handle duplicates
+    df = df.drop_duplicates()
+
+    # Step 3: Ensure proper data types for specific columns
+    df['case_length'] = pd.to_numeric(df.get('Case Length', pd.Series(dtype='float')), errors='coerce')
+    df['case_width'] = pd.to_numeric(df.get('Case Width', pd.Series(dtype='float')), errors='coerce')
+    df['case_height'] = pd.to_numeric(df.get('Case Height', pd.Series(dtype='float')), errors='coerce')
+    df['case_pack'] = pd.to_numeric(df.get('Case Pack', pd.Series(dtype='int')), errors='coerce')
+    df['price_each_fob'] = pd.to_numeric(df.get('Price Each (FOB Plant)', pd.Series(dtype='float')), errors='coerce')
+    df['liner'] = df.get('Liner (Yes or No)', '').str.lower().map({'yes': True, 'no': False})
+
+    # Convert 'liner' to boolean or None
+    df['liner'] = df['liner'].map({True: True, False: False}).where(df['liner'].notna(), None)
+
+    # Step 4: Create 'specs' column
+    specs_columns = [
+        'Thread Count / GSM', 'Materal ', 'Edge Designs', 'Fabric Treatments',
+        'Quilting Designs', 'Specialized Features'
+    ]
+    df['specs'] = df[specs_columns].apply(lambda row: row.dropna().to_dict(), axis=1)
+
+    # Convert 'specs' to JSON strings for database insertion
+    df['specs'] = df['specs'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else x)
+
+    # Drop unused columns
+    columns_to_drop = specs_columns + [
+        'Case Length', 'Case Width', 'Case Height', 'Case Pack', 'Price Each (FOB Plant)', 'Liner (Yes or No)'
+    ]
+    df = df.drop(columns=columns_to_drop)
+
+    # Rename columns to match database schema
+    column_mapping = {
+        'Category': 'category',
+        'Sub Category': 'sub_category',
+        'Collection': 'collection',
+        'SKU': 'sku',
+        'Size Type': 'size_type',
+        'Size': 'size',
+        'Fill Weight': 'fill_weight',
+    }
+    df.rename(columns=column_mapping, inplace=True)
+
+    # Step 5: Remove ™ and ® symbols from all text columns
+    def clean_symbols(value):
+        if isinstance(value, str):
+            return re.sub(r"[™®]", "", value).strip()
+        return value
+
+    df = df.applymap(clean_symbols)
+    return df
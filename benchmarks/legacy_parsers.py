@@ -0,0 +1,401 @@
+"""
+Frozen copy of the detail parsers as they were before the compiled pattern
+registry (keeco_patterns). bench_parsers.py uses them as the "before"
+baseline and checks that the current parsers still produce the same output.
+attach_variant_details is the substring-scan matcher from before the size
+index, for bench_variant_details.py. Do not edit.
+"""
+import re
+
+from keeco_text import clean_text
+
+
+def extract_dimensions(text):
+    """Extract standardized dimensions from text with size context."""
+    if not isinstance(text, str):
+        return ""
+    
+    def standardize_measurement(dimension):
+        # Convert fraction strings to decimal
+        fraction_pattern = r'(\d+)\s*(?:-|and)?\s*(\d+)/(\d+)'
+        fraction_match = re.search(fraction_pattern, dimension)
+        if fraction_match:
+            whole = int(fraction_match.group(1))
+            num = int(fraction_match.group(2))
+            denom = int(fraction_match.group(3))
+            decimal = whole + (num / denom)
+            dimension = str(decimal)
+        
+        # Clean up the number and convert to float for standardization
+        try:
+            num = float(re.sub(r'[^\d.]', '', dimension))
+            return '{:.2f}'.format(num)
+        except ValueError:
+            return dimension
+    
+    def process_dimension_group(dim_text):
+        # Common dimension patterns with optional size prefixes
+        patterns = [
+            # Standard dimensions with optional quotes/inches
+            r'(\d+(?:\s*-?\s*\d+/\d+)?|\d+(?:\.\d+)?)\s*(?:"|in(?:ch(?:es)?)?|\'|feet)?\s*[xX]\s*'
+            r'(\d+(?:\s*-?\s*\d+/\d+)?|\d+(?:\.\d+)?)\s*(?:"|in(?:ch(?:es)?)?|\'|feet)?\s*'
+            r'(?:[xX]\s*(\d+(?:\s*-?\s*\d+/\d+)?|\d+(?:\.\d+)?)\s*(?:"|in(?:ch(?:es)?)?|\'|feet)?)?',
+            
+            # Dimensions with explicit labels
+            r'(?:L|Length|W|Width|H|Height)\s*[=:]\s*'
+            r'(\d+(?:\s*-?\s*\d+/\d+)?|\d+(?:\.\d+)?)\s*(?:"|in(?:ch(?:es)?)?|\'|feet)?'
+        ]
+        
+        for pattern in patterns:
+            matches = list(re.finditer(pattern, dim_text, re.IGNORECASE))
+            if matches:
+                dimensions = []
+                for match in matches:
+                    # Get all capturing groups that contain numbers
+                    dims = [g for g in match.groups() if g and re.search(r'\d', g)]
+                    if dims:
+                        # Standardize each measurement
+                        standardized_dims = [standardize_measurement(d) for d in dims]
+                        dimensions.append(' x '.join([f'{d}"' for d in standardized_dims]))
+                return '; '.join(dimensions)
+        return ""
+    
+    # Split text into size-specific sections
+    size_sections = re.split(r'(?:\b(?:Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)\b)[:\s-]+', text)
+    
+    # Process each section
+    dimensions = []
+    current_size = ""
+    
+    for i, section in enumerate(size_sections):
+        if i == 0 and not re.search(r'\b(?:Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)\b', text):
+            # This is the only section and has no size prefix
+            processed = process_dimension_group(section)
+            if processed:
+                dimensions.append(processed)
+        else:
+            # Look for size prefix before this section
+            size_match = re.search(r'\b(Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)\b', 
+                                 text[:text.find(section)], 
+                                 re.IGNORECASE)
+            if size_match:
+                current_size = size_match.group(1)
+                processed = process_dimension_group(section)
+                if processed:
+                    dimensions.append(f"{current_size}: {processed}")
+    
+    return '; '.join(filter(None, dimensions))
+
+def clean_dimensions(dimensions_data, shipping_data=""):
+    """Clean and merge dimension data from different sources."""
+    if not dimensions_data and not shipping_data:
+        return ""
+        
+    all_dimensions = []
+    
+    # Helper function to process dimension text
+    def process_dim_text(text, prefix=""):
+        if not isinstance(text, str):
+            return []
+        
+        # Split by common separators
+        parts = re.split(r'[;,\n]|\s+(?=[A-Za-z]+:)', text)
+        processed_dims = []
+        
+        for part in parts:
+            # Look for size prefixes
+            size_match = re.match(r'(?:Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)[:\s-]+(.+)', part, re.IGNORECASE)
+            dims = size_match.group(1) if size_match else part
+            
+            # Extract dimensions
+            dim_matches = re.findall(r'(\d+(?:\.\d+)?)\s*(?:"|inches?|\'|[xX])+\s*(\d+(?:\.\d+)?)\s*(?:"|inches?|\')?(?:\s*[xX]\s*(\d+(?:\.\d+)?)\s*(?:"|inches?|\')?)?', dims)
+            
+            for match in dim_matches:
+                # Filter out zero dimensions and standardize
+                valid_dims = ['{:.2f}'.format(float(d)) for d in match if d and float(d) > 0]
+                if valid_dims:
+                    dim_str = ' x '.join(f'{d}"' for d in valid_dims)
+                    if size_match:
+                        dim_str = f"{size_match.group(0).strip()}: {dim_str}"
+                    if prefix:
+                        dim_str = f"{prefix}: {dim_str}"
+                    processed_dims.append(dim_str)
+                    
+        return processed_dims
+
+    # Process product dimensions
+    if dimensions_data:
+        all_dimensions.extend(process_dim_text(dimensions_data, "Product"))
+        
+    # Process shipping dimensions
+    if shipping_data:
+        ship_dims = process_dim_text(shipping_data, "Shipping")
+        # Only add shipping dimensions if they're different from product dimensions
+        for dim in ship_dims:
+            if dim not in all_dimensions:
+                all_dimensions.append(dim)
+    
+    return '; '.join(filter(None, all_dimensions))
+
+def merge_fill_weights(product_fill_weight, shipping_fill_weight):
+    """Merge and standardize fill weights from multiple sources."""
+    weights = []
+    
+    for weight_text in [product_fill_weight, shipping_fill_weight]:
+        if not isinstance(weight_text, str):
+            continue
+            
+        # Split by size indicators
+        parts = re.split(r'(?:Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)[:\s-]+', weight_text)
+        
+        for part in parts:
+            # Extract weights with units
+            matches = re.finditer(r'(\d+(?:\.\d+)?)\s*(?:oz\.?|ounces?|lbs?\.?|pounds?)', part, re.IGNORECASE)
+            
+            for match in matches:
+                weight = match.group(1)
+                unit = match.group(0)[len(weight):].strip().lower()
+                
+                # Convert to ounces if in pounds
+                if any(u in unit for u in ['lb', 'pound']):
+                    weight = str(float(weight) * 16)
+                
+                # Standardize format
+                weight = '{:.2f}'.format(float(weight))
+                weights.append(f"{weight} oz")
+    
+    # Remove duplicates and sort
+    return '; '.join(sorted(set(weights)))
+
+def clean_fill_weight(weight_text):
+    """Standardize fill weight format."""
+    if not isinstance(weight_text, str):
+        return ""
+    
+    weights = []
+    # Split by common separators
+    parts = re.split(r'[;,\n]|\s+(?=[A-Za-z]+:)', weight_text)
+    
+    for part in parts:
+        # Extract size-specific weights
+        size_match = re.match(r'(Standard|Queen|King|Twin|Full|Cal[ifornia]*\s*King)[:\s-]+(.+)', part, re.IGNORECASE)
+        if size_match:
+            size, weight_part = size_match.groups()
+        else:
+            weight_part = part
+            
+        # Extract weight and unit
+        weight_matches = re.finditer(r'(\d+(?:\.\d+)?)\s*(?:oz\.?|ounces?|lbs?\.?|pounds?)', weight_part, re.IGNORECASE)
+        for match in weight_matches:
+            weight = match.group(1)
+            unit_text = match.group(0)[len(weight):].strip().lower()
+            
+            # Convert to ounces if in pounds
+            if 'lb' in unit_text or 'pound' in unit_text:
+                weight = str(float(weight) * 16)
+            
+            # Round to 2 decimal places and remove trailing zeros
+            weight = str(float('{:.2f}'.format(float(weight))))
+            weights.append(f"{weight} oz")
+    
+    return "; ".join(weights)
+
+def clean_type_size(parent_name, type_size):
+    """Clean and standardize type_size."""
+    if not isinstance(type_size, str):
+        return ""
+    
+    # Remove parent name and special characters
+    type_size = re.sub(r'[®™©]', '', type_size)
+    if parent_name:
+        type_size = re.sub(re.escape(parent_name), '', type_size, flags=re.IGNORECASE)
+    
+    # Standardize size formats
+    size_patterns = {
+        r'\b(?:std|standard)\b': 'Standard',
+        r'\b(?:kg|king)\b': 'King',
+        r'\bcal(?:ifornia)?\s*k(?:ing)?\b': 'California King',
+        r'\b(?:qn|queen)\b': 'Queen',
+        r'\bfull\b': 'Full',
+        r'\btwin\s*xl\b': 'Twin XL',
+        r'\btwin\b': 'Twin',
+        r'\bjumbo\b': 'Jumbo',
+        r'\beuro\b': 'Euro'
+    }
+    
+    # Clean up the text
+    cleaned = type_size.lower()
+    cleaned = re.sub(r'^.*?(?:pillow|insert|cover|protector|pack|size)\s*[-:,]?\s*', '', cleaned)
+    cleaned = re.sub(r'(?:by|from)\s+.*$', '', cleaned)
+    cleaned = re.sub(r'\s+', ' ', cleaned)
+    cleaned = cleaned.strip()
+    
+    # Apply standardization
+    result = cleaned
+    for pattern, replacement in size_patterns.items():
+        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
+    
+    # Extract density if present
+    density_match = re.search(r'(soft|medium|firm)\s*(?:density|support)?', result, re.IGNORECASE)
+    density = density_match.group(1).title() if density_match else ""
+    
+    # Clean up size
+    size_match = re.search(r'\b(Standard|Queen|King|Twin XL|Twin|Full|California King|Jumbo|Euro)\b', result)
+    size = size_match.group(1) if size_match else ""
+    
+    # Combine size and density
+    if size and density:
+        return f"{size} - {density}"
+    return size if size else cleaned
+
+def clean_shipping_info(dimensions, weight):
+    """Clean and standardize shipping information."""
+    if not isinstance(dimensions, str) or not isinstance(weight, str):
+        return "", ""
+    
+    # Process dimensions
+    dims = extract_dimensions(dimensions)
+    
+    # Process weight
+    weights = []
+    matches = re.finditer(r'(\d+(?:\.\d+)?)\s*(?:lbs?\.?|pounds?)', weight, re.IGNORECASE)
+    
+    for match in matches:
+        weight_val = match.group(1)
+        # Standardize to 2 decimal places
+        weight_val = '{:.2f}'.format(float(weight_val))
+        weights.append(f"{weight_val} lbs")
+    
+    return dims, "; ".join(sorted(set(weights)))
+
+def clean_image_urls(images):
+    """Clean up image URLs by removing anything after .jpg."""
+    cleaned_images = []
+    for img_url in images:
+        match = re.match(r"(.*?\.jpg)", img_url)  # Properly close the regex pattern
+        if match:
+            cleaned_images.append(match.group(1))
+    return cleaned_images
+
+def parse_details_by_variant(details):
+    """
+    Parse details section to map information to specific variants.
+    Returns a dictionary mapping variant sizes to their specific details.
+    """
+    variant_details = {}
+    
+    # Fields that should be variant-specific
+    variant_specific_fields = {
+        'Dimensions': True,
+        'Fill Weight': True,
+        'Shipping Carton': True,
+        'Shipping Carton Weight': True,
+        'units_per_case': True
+    }
+    
+    # Process each detail field
+    for key, value in details.items():
+        if not isinstance(value, str):
+            continue
+            
+        # Check if this is a variant-specific field
+        if key in variant_specific_fields:
+            # Split on line breaks and common separators
+            parts = re.split(r'[;\n]', value)
+            for part in parts:
+                # Try to extract size/variant and corresponding value
+                size_match = re.match(
+                    r'^(Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)[:\s-]+(.+)$',
+                    part.strip(),
+                    re.IGNORECASE
+                )
+                if size_match:
+                    variant, detail = size_match.groups()
+                    variant = variant.strip()
+                    detail = detail.strip()
+                    
+                    if variant not in variant_details:
+                        variant_details[variant] = {}
+                    variant_details[variant][key] = detail
+        else:
+            # For non-variant-specific fields, apply to all known variants
+            for variant in set(variant_details.keys()) | {'Standard', 'Queen', 'King', 'Twin', 'Full', 'California King'}:
+                if variant not in variant_details:
+                    variant_details[variant] = {}
+                variant_details[variant][key] = value.strip()
+    
+    return variant_details
+
+def standardize_shipping_info(shipping_dims, shipping_weight):
+    """Standardize shipping information format."""
+    standardized_info = []
+    
+    # Process dimensions
+    if shipping_dims:
+        dims = extract_dimensions(shipping_dims)
+        if dims:
+            standardized_info.append(f"Shipping Dimensions: {dims}")
+    
+    # Process weight
+    if shipping_weight:
+        weight_matches = re.finditer(r'(\d+(?:\.\d+)?)\s*(?:lbs?\.?|pounds?)', shipping_weight, re.IGNORECASE)
+        weights = []
+        for match in weight_matches:
+            weight_val = float(match.group(1))
+            weights.append(f"{weight_val:.2f} lbs")
+        if weights:
+            standardized_info.append(f"Shipping Weight: {'; '.join(weights)}")
+    
+    return " | ".join(standardized_info)
+
+def standardize_case_info(units_per_case):
+    """Standardize case quantity information."""
+    if not units_per_case:
+        return ""
+    
+    # Extract numeric value only
+    case_match = re.search(r'(\d+)', str(units_per_case))
+    if case_match:
+        return case_match.group(1)
+    return ""
+
+def attach_variant_details(table_data, raw_details):
+    """Match parsed detail fields to each table row and store them under row["details"]."""
+    # Parse details by variant and apply enhanced cleaning
+    variant_details = parse_details_by_variant(raw_details)
+    
+    # Update table_data with cleaned and merged details
+    for row in table_data:
+        type_size = row["type_size"]
+        matched_details = None
+        
+        # Find matching variant details
+        for variant, details in variant_details.items():
+            if type_size.lower() in variant.lower() or variant.lower() in type_size.lower():
+                matched_details = details
+                break
+        
+        if not matched_details:
+            matched_details = raw_details
+        
+        # Clean and merge dimensions and weights
+        dimensions = clean_dimensions(
+            matched_details.get("Dimensions", ""),
+            matched_details.get("Shipping Carton", "")
+        )
+        
+        fill_weight = merge_fill_weights(
+            matched_details.get("Fill Weight", ""),
+            matched_details.get("Additional Fill Weight", "")
+        )
+        
+        row["details"] = {
+            "Dimensions": dimensions,
+            "Fill Weight": fill_weight,
+            "Care": clean_text(matched_details.get("Care", "")),
+            "Design": clean_text(matched_details.get("Design", "")),
+            "Fabric": clean_text(matched_details.get("Fabric", "")),
+            "Fill Type": clean_text(matched_details.get("Fill Type", "")),
+            "Origin": clean_text(matched_details.get("Origin", "")),
+            "Warranties": clean_text(matched_details.get("Warranties", ""))
+        }
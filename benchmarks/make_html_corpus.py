@@ -0,0 +1,122 @@
+"""
+Build the offline HTML corpus in benchmarks/corpus/html from the recorded fixtures.
+
+The live site needs a login, so the corpus is made of sanitized product page
+snapshots: the markup keeco_scraper selects on (#product-content, the product
+name and long description, the mobile image container, .order-table and the
+#detail key/value columns) with the detail strings recorded in
+corpus/variant_details.json, and names, SKUs, prices and image URLs replaced
+by made-up values. Names and descriptions include the trademark symbols,
+HTML entities and mojibake that clean_text has to handle.
+
+Writes:
+    corpus/html/products/<slug>.html   one page per product
+    corpus/html/manifest.json          categories and their product slugs, in listing order
+
+fixture_server.py serves these pages (and renders listing pages for them).
+The output is deterministic; rerun this script after changing the fixtures.
+
+Usage:
+    python benchmarks/make_html_corpus.py
+"""
+import html
+import json
+import os
+import random
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_PATH = os.path.join(HERE, "corpus", "variant_details.json")
+OUTPUT_DIR = os.path.join(HERE, "corpus", "html")
+
+CATEGORIES = [
+    ("Pillows", "pillows", "Pillow"),
+    ("Comforters", "comforters", "Comforter"),
+    ("Protectors", "protectors", "Protector"),
+    ("Mattress Pads", "mattress-pads", "Mattress Pad"),
+    ("Sheet Sets", "sheet-sets", "Sheet Set"),
+    ("Bath", "bath", "Towel"),
+]
+COLLECTIONS = ["Simple Comfort™", "Hotel Collection®", "Sleep & Beyond", "Essentials", "Luxe™ Down Alternative",
+               "Cloud Rest", "Serenity®", "Hampton"]
+DESCRIPTIONS = [
+    "Soft, durable and easy to care for.\nMade for daily use in busy properties.",
+    "Hypoallergenic fill with a 233 thread count cotton shell – machine washable.",
+    "Our best-selling item for full-service hotels; â€œguest favoriteâ€\x9d.",
+    "Stain release finish.   Corded edge.\n\nShips flat-packed.",
+]
+CASE_PACKS = ["4", "6 per case", "Case of 12", "2/cs", "1"]
+
+
+def product_page(name, description, images, rows, details):
+    """Product page markup with the structure keeco_scraper parses."""
+    escape = html.escape
+    image_tags = "".join(f'<img src="{escape(url)}" alt="">' for url in images)
+    # The first cell holds the SKU; fixture_server.py makes SKUs unique per catalog copy
+    table_rows = "".join(
+        '<tr><td class="sku">' + "</td><td>".join(escape(cell) for cell in row) + "</td></tr>"
+        for row in rows
+    )
+    detail_rows = "".join(
+        f'<div class="row"><div class="col-1">{escape(key)}</div><div class="col-2">{escape(value)}</div></div>'
+        for key, value in details.items()
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{escape(name)} | Keeco Hospitality</title></head>
+<body>
+<div id="header"><div class="content"><div class="customer-info">Signed in</div></div></div>
+<div id="main">
+<div id="product-content" class="product-detail">
+<h1><div class="product-name">{escape(name)}</div></h1>
+<div class="product-image-container mobile-show">{image_tags}</div>
+<div class="product-long-description"><p>{escape(description).replace(chr(10), "<br>")}</p></div>
+<div class="order-table"><table>
+<tr><th>Item</th><th>Product Name</th><th>Price/Unit</th><th>Unit/Case</th><th>Qty</th></tr>
+{table_rows}
+</table></div>
+<div id="detail">{detail_rows}</div>
+</div>
+</div>
+<script>window.dataLayer = window.dataLayer || [];</script>
+</body>
+</html>
+"""
+
+
+def main():
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        fixtures = json.load(f)
+
+    rng = random.Random(2024)
+    os.makedirs(os.path.join(OUTPUT_DIR, "products"), exist_ok=True)
+    manifest = {"categories": [{"name": name, "slug": slug, "products": []} for name, slug, _ in CATEGORIES]}
+
+    for number, fixture in enumerate(fixtures):
+        category_index = number % len(CATEGORIES)
+        _, category_slug, noun = CATEGORIES[category_index]
+        name = f"{rng.choice(COLLECTIONS)} {noun}"
+        slug = f"{category_slug}-{number:03d}"
+        sku_prefix = f"KE{number:03d}"
+        images = [f"https://www.keecohospitality.com/dw/image/v2/{sku_prefix}_{i}.jpg?sw=800&sh=800" for i in range(rng.randint(1, 3))]
+        if rng.random() < 0.3:
+            images.append("https://www.keecohospitality.com/on/demandware.static/placeholder.png")
+
+        rows = []
+        for i, row in enumerate(fixture["rows"]):
+            product_name = f"{name} {row['type_size']}".strip()
+            price = f"${rng.uniform(4, 180):,.2f}"
+            rows.append([f"{sku_prefix}-{i + 1:02d}", product_name, price, rng.choice(CASE_PACKS), ""])
+
+        page = product_page(name, rng.choice(DESCRIPTIONS), images, rows, fixture["raw_details"])
+        with open(os.path.join(OUTPUT_DIR, "products", slug + ".html"), "w", encoding="utf-8") as f:
+            f.write(page)
+        manifest["categories"][category_index]["products"].append(slug)
+
+    with open(os.path.join(OUTPUT_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+        f.write("\n")
+    print(f"Wrote {len(fixtures)} product pages to {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
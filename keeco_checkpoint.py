@@ -0,0 +1,79 @@
+"""
+Append-only checkpoint journal for long keeco_scraper crawls.
+
+Every scraped product is appended to a JSON Lines file as soon as it is
+processed, and a marker line is written when a category finishes. A run
+started with --resume rebuilds the set of processed URLs from the journal,
+streams the recorded products back out, then continues from the first
+product that was not yet recorded.
+"""
+import json
+import os
+import threading
+
+
+class CheckpointJournal:
+    """JSON Lines journal of scraped products and completed categories."""
+
+    def __init__(self, path="crawl_checkpoint.jsonl", resume=False):
+        self.path = path
+        self.lock = threading.Lock()
+        self.product_count = 0
+        self.processed_urls = set()
+        self.completed_categories = set()
+        if resume and os.path.exists(path):
+            self._drop_partial_line()
+            self._load()
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def _drop_partial_line(self):
+        """Cut off a trailing line left unfinished by a crash, so appends start clean."""
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def _entries(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Ignoring unreadable checkpoint line {line_number}")
+
+    def _load(self):
+        for entry in self._entries():
+            if entry["type"] == "product":
+                self.product_count += 1
+                self.processed_urls.add(entry["product"]["url"])
+            elif entry["type"] == "category_done":
+                self.completed_categories.add(entry["category"])
+        print(f"Resuming from checkpoint: {self.product_count} products, "
+              f"{len(self.completed_categories)} completed categories")
+
+    def replay_products(self):
+        """Yield the products recorded before this run, without holding them all in memory."""
+        if not self.product_count:
+            return
+        replayed = 0
+        for entry in self._entries():
+            if entry["type"] == "product":
+                yield entry["product"]
+                replayed += 1
+                if replayed == self.product_count:
+                    return
+
+    def _append(self, entry):
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+
+    def record_product(self, product):
+        self._append({"type": "product", "product": product})
+
+    def record_category_done(self, category):
+        self._append({"type": "category_done", "category": category})
+
+    def close(self):
+        with self.lock:
+            self.file.close()
@@ -0,0 +1,436 @@
+"""
+Detail parsers for keeco product pages: dimensions, fill weights, type sizes,
+shipping and case information, and clean_product, which applies them to a
+raw product record extracted by keeco_scraper.
+
+All regular expressions come precompiled from keeco_patterns, so the parsers
+do no per-call pattern compilation or cache lookups, and importing this module
+has none of keeco_scraper's side effects (no browser, no credentials).
+"""
+import re
+from collections import namedtuple
+
+from keeco_patterns import (
+    BY_FROM_SUFFIX,
+    CANONICAL_SIZE,
+    DENSITY,
+    DETAIL_PART_SPLIT,
+    DIMENSION_GROUP_PATTERNS,
+    DIMENSION_TRIPLE,
+    FIRST_INTEGER,
+    FRACTION,
+    HAS_DIGIT,
+    JPG_URL,
+    NON_NUMERIC,
+    POUNDS,
+    PRODUCT_WORD_PREFIX,
+    SIZE_LINE,
+    SIZE_PREFIX,
+    SIZE_SPLIT,
+    SIZE_WORD,
+    TRADEMARKS,
+    VARIANT_LINE_SPLIT,
+    WEIGHT,
+    WHITESPACE,
+    canonicalize_sizes,
+    iter_size_sections,
+    size_token,
+)
+from keeco_text import clean_text
+
+
+def extract_dimensions(text):
+    """Extract standardized dimensions from text with size context."""
+    if not isinstance(text, str):
+        return ""
+
+    def standardize_measurement(dimension):
+        # Convert fraction strings to decimal
+        fraction_match = FRACTION.search(dimension)
+        if fraction_match:
+            whole = int(fraction_match.group(1))
+            num = int(fraction_match.group(2))
+            denom = int(fraction_match.group(3))
+            decimal = whole + (num / denom)
+            dimension = str(decimal)
+
+        # Clean up the number and convert to float for standardization
+        try:
+            num = float(NON_NUMERIC.sub('', dimension))
+            return '{:.2f}'.format(num)
+        except ValueError:
+            return dimension
+
+    def process_dimension_group(dim_text):
+        # Common dimension patterns: "20 x 26 x 4" style, then explicit labels
+        for pattern in DIMENSION_GROUP_PATTERNS:
+            matches = list(pattern.finditer(dim_text))
+            if matches:
+                dimensions = []
+                for match in matches:
+                    # Get all capturing groups that contain numbers
+                    dims = [g for g in match.groups() if g and HAS_DIGIT.search(g)]
+                    if dims:
+                        # Standardize each measurement
+                        standardized_dims = [standardize_measurement(d) for d in dims]
+                        dimensions.append(' x '.join([f'{d}"' for d in standardized_dims]))
+                return '; '.join(dimensions)
+        return ""
+
+    # Text that mentions a size anywhere is only read inside size sections
+    has_size = SIZE_WORD.search(text) is not None
+
+    # Process each size-specific section
+    dimensions = []
+
+    for size_label, (start, end) in iter_size_sections(text):
+        if size_label is None and has_size:
+            # Text before the first size label
+            continue
+        processed = process_dimension_group(text[start:end])
+        if processed:
+            dimensions.append(f"{size_label}: {processed}" if size_label else processed)
+
+    return '; '.join(filter(None, dimensions))
+
+def clean_dimensions(dimensions_data, shipping_data=""):
+    """Clean and merge dimension data from different sources."""
+    if not dimensions_data and not shipping_data:
+        return ""
+
+    all_dimensions = []
+
+    # Helper function to process dimension text
+    def process_dim_text(text, prefix=""):
+        if not isinstance(text, str):
+            return []
+
+        # Split by common separators
+        parts = DETAIL_PART_SPLIT.split(text)
+        processed_dims = []
+
+        for part in parts:
+            # Look for size prefixes
+            size_match = SIZE_PREFIX.match(part)
+            dims = size_match.group(2) if size_match else part
+
+            # Extract dimensions
+            dim_matches = DIMENSION_TRIPLE.findall(dims)
+
+            for match in dim_matches:
+                # Filter out zero dimensions and standardize
+                valid_dims = ['{:.2f}'.format(float(d)) for d in match if d and float(d) > 0]
+                if valid_dims:
+                    dim_str = ' x '.join(f'{d}"' for d in valid_dims)
+                    if size_match:
+                        dim_str = f"{size_match.group(0).strip()}: {dim_str}"
+                    if prefix:
+                        dim_str = f"{prefix}: {dim_str}"
+                    processed_dims.append(dim_str)
+
+        return processed_dims
+
+    # Process product dimensions
+    if dimensions_data:
+        all_dimensions.extend(process_dim_text(dimensions_data, "Product"))
+
+    # Process shipping dimensions
+    if shipping_data:
+        ship_dims = process_dim_text(shipping_data, "Shipping")
+        # Only add shipping dimensions if they're different from product dimensions
+        for dim in ship_dims:
+            if dim not in all_dimensions:
+                all_dimensions.append(dim)
+
+    return '; '.join(filter(None, all_dimensions))
+
+def merge_fill_weights(product_fill_weight, shipping_fill_weight):
+    """Merge and standardize fill weights from multiple sources."""
+    weights = []
+
+    for weight_text in [product_fill_weight, shipping_fill_weight]:
+        if not isinstance(weight_text, str):
+            continue
+
+        # Split by size indicators
+        parts = SIZE_SPLIT.split(weight_text)
+
+        for part in parts:
+            # Extract weights with units
+            for match in WEIGHT.finditer(part):
+                weight = match.group(1)
+                unit = match.group(0)[len(weight):].strip().lower()
+
+                # Convert to ounces if in pounds
+                if any(u in unit for u in ['lb', 'pound']):
+                    weight = str(float(weight) * 16)
+
+                # Standardize format
+                weight = '{:.2f}'.format(float(weight))
+                weights.append(f"{weight} oz")
+
+    # Remove duplicates and sort
+    return '; '.join(sorted(set(weights)))
+
+def clean_fill_weight(weight_text):
+    """Standardize fill weight format."""
+    if not isinstance(weight_text, str):
+        return ""
+
+    weights = []
+    # Split by common separators
+    parts = DETAIL_PART_SPLIT.split(weight_text)
+
+    for part in parts:
+        # Extract size-specific weights
+        size_match = SIZE_PREFIX.match(part)
+        if size_match:
+            size, weight_part = size_match.groups()
+        else:
+            weight_part = part
+
+        # Extract weight and unit
+        for match in WEIGHT.finditer(weight_part):
+            weight = match.group(1)
+            unit_text = match.group(0)[len(weight):].strip().lower()
+
+            # Convert to ounces if in pounds
+            if 'lb' in unit_text or 'pound' in unit_text:
+                weight = str(float(weight) * 16)
+
+            # Round to 2 decimal places and remove trailing zeros
+            weight = str(float('{:.2f}'.format(float(weight))))
+            weights.append(f"{weight} oz")
+
+    return "; ".join(weights)
+
+def clean_type_size(parent_name, type_size):
+    """Clean and standardize type_size."""
+    if not isinstance(type_size, str):
+        return ""
+
+    # Remove parent name and special characters
+    type_size = TRADEMARKS.sub('', type_size)
+    if parent_name:
+        type_size = re.sub(re.escape(parent_name), '', type_size, flags=re.IGNORECASE)
+
+    # Clean up the text
+    cleaned = type_size.lower()
+    cleaned = PRODUCT_WORD_PREFIX.sub('', cleaned)
+    cleaned = BY_FROM_SUFFIX.sub('', cleaned)
+    cleaned = WHITESPACE.sub(' ', cleaned)
+    cleaned = cleaned.strip()
+
+    # Standardize size formats
+    result = canonicalize_sizes(cleaned)
+
+    # Extract density if present
+    density_match = DENSITY.search(result)
+    density = density_match.group(1).title() if density_match else ""
+
+    # Clean up size
+    size_match = CANONICAL_SIZE.search(result)
+    size = size_match.group(1) if size_match else ""
+
+    # Combine size and density
+    if size and density:
+        return f"{size} - {density}"
+    return size if size else cleaned
+
+def clean_shipping_info(dimensions, weight):
+    """Clean and standardize shipping information."""
+    if not isinstance(dimensions, str) or not isinstance(weight, str):
+        return "", ""
+
+    # Process dimensions
+    dims = extract_dimensions(dimensions)
+
+    # Process weight
+    weights = []
+    for match in POUNDS.finditer(weight):
+        weight_val = match.group(1)
+        # Standardize to 2 decimal places
+        weight_val = '{:.2f}'.format(float(weight_val))
+        weights.append(f"{weight_val} lbs")
+
+    return dims, "; ".join(sorted(set(weights)))
+
+def clean_image_urls(images):
+    """Clean up image URLs by removing anything after .jpg."""
+    cleaned_images = []
+    for img_url in images:
+        match = JPG_URL.match(img_url)
+        if match:
+            cleaned_images.append(match.group(1))
+    return cleaned_images
+
+# Sizes that detail fields without a size label apply to
+VARIANT_SIZES = ('Standard', 'Queen', 'King', 'Twin', 'Full', 'California King')
+
+# Detail lines have no Twin XL label, so Twin XL rows read the Twin details
+DETAIL_SIZE_ALIASES = {'Twin XL': 'Twin'}
+
+# Fields that should be variant-specific
+VARIANT_SPECIFIC_FIELDS = {'Dimensions', 'Fill Weight', 'Shipping Carton', 'Shipping Carton Weight', 'units_per_case'}
+
+# Detail fields of one product: fields shared by every size, stored once, and
+# the variant-specific fields of each canonical size (see size_token)
+VariantDetails = namedtuple("VariantDetails", ["shared", "by_size"])
+
+def parse_details_by_variant(details):
+    """
+    Parse details section to map information to specific variants.
+    Returns a VariantDetails; look up a row's details with match_variant_details.
+    """
+    shared = {}
+    by_size = {}
+
+    # Process each detail field
+    for key, value in details.items():
+        if not isinstance(value, str):
+            continue
+
+        # Check if this is a variant-specific field
+        if key in VARIANT_SPECIFIC_FIELDS:
+            # Split on line breaks and common separators
+            for part in VARIANT_LINE_SPLIT.split(value):
+                # Try to extract size/variant and corresponding value
+                size_match = SIZE_LINE.match(part.strip())
+                if size_match:
+                    variant, detail = size_match.groups()
+                    by_size.setdefault(size_token(variant), {})[key] = detail.strip()
+        else:
+            shared[key] = value.strip()
+
+    return VariantDetails(shared, by_size)
+
+def match_variant_details(variant_details, type_size):
+    """
+    Details for a row's cleaned type_size, found by a dict lookup on its
+    canonical size. Returns None when no size matches.
+    """
+    shared, by_size = variant_details
+    if not type_size:
+        # An empty type size matches the first variant, as the old substring scan did
+        size = next(iter(by_size), None)
+    else:
+        size = size_token(type_size)
+        size = DETAIL_SIZE_ALIASES.get(size, size)
+
+    specific = by_size.get(size)
+    if specific is None:
+        # Shared fields apply to every known size, even one without its own details
+        return shared if shared and (not type_size or size in VARIANT_SIZES) else None
+    return {**shared, **specific}
+
+def attach_variant_details(table_data, raw_details):
+    """Match parsed detail fields to each table row and store them under row["details"]."""
+    # Parse details by variant and apply enhanced cleaning
+    variant_details = parse_details_by_variant(raw_details)
+
+    # Update table_data with cleaned and merged details
+    for row in table_data:
+        matched_details = match_variant_details(variant_details, row["type_size"]) or raw_details
+
+        # Clean and merge dimensions and weights
+        dimensions = clean_dimensions(
+            matched_details.get("Dimensions", ""),
+            matched_details.get("Shipping Carton", "")
+        )
+
+        fill_weight = merge_fill_weights(
+            matched_details.get("Fill Weight", ""),
+            matched_details.get("Additional Fill Weight", "")
+        )
+
+        row["details"] = {
+            "Dimensions": dimensions,
+            "Fill Weight": fill_weight,
+            "Care": clean_text(matched_details.get("Care", "")),
+            "Design": clean_text(matched_details.get("Design", "")),
+            "Fabric": clean_text(matched_details.get("Fabric", "")),
+            "Fill Type": clean_text(matched_details.get("Fill Type", "")),
+            "Origin": clean_text(matched_details.get("Origin", "")),
+            "Warranties": clean_text(matched_details.get("Warranties", ""))
+        }
+
+def standardize_shipping_info(shipping_dims, shipping_weight):
+    """Standardize shipping information format."""
+    standardized_info = []
+
+    # Process dimensions
+    if shipping_dims:
+        dims = extract_dimensions(shipping_dims)
+        if dims:
+            standardized_info.append(f"Shipping Dimensions: {dims}")
+
+    # Process weight
+    if shipping_weight:
+        weights = []
+        for match in POUNDS.finditer(shipping_weight):
+            weight_val = float(match.group(1))
+            weights.append(f"{weight_val:.2f} lbs")
+        if weights:
+            standardized_info.append(f"Shipping Weight: {'; '.join(weights)}")
+
+    return " | ".join(standardized_info)
+
+def standardize_case_info(units_per_case):
+    """Standardize case quantity information."""
+    if not units_per_case:
+        return ""
+
+    # Extract numeric value only
+    case_match = FIRST_INTEGER.search(str(units_per_case))
+    if case_match:
+        return case_match.group(1)
+    return ""
+
+
+def clean_product(record):
+    """
+    Clean a raw product record from keeco_scraper.extract_product_html.
+
+    Returns the product_data dict: cleaned name and description, the table
+    rows with cleaned SKU, type size and case count, and each row's details.
+    Other keys of the record (such as "category") are kept. Records without
+    a "raw" entry (products cleaned by an earlier version, error records)
+    are returned unchanged, so records stored in crawl state or a checkpoint
+    can always be passed through. Only depends on its argument, so it can
+    run in a worker process.
+    """
+    raw = record.get("raw")
+    if raw is None:
+        return record
+
+    product_data = {"url": record["url"]}
+    product_data["parent_name"] = clean_text(raw["parent_name"])
+    product_data["long_description"] = clean_text(raw["long_description"])
+    product_data["images"] = raw["images"]
+
+    table_data = []
+    header_mapping = [clean_text(header) for header in raw["table_headers"]]
+    for cols in raw["table_rows"]:
+        if len(cols) == len(header_mapping):
+            table_data.append({
+                "item": clean_text(cols[header_mapping.index("Item")]) if "Item" in header_mapping else "",
+                "type_size": clean_type_size(
+                    product_data["parent_name"],
+                    cols[header_mapping.index("Product Name")]
+                ) if "Product Name" in header_mapping else "",
+                "price_per_unit": cols[header_mapping.index("Price/Unit")] if "Price/Unit" in header_mapping else "",
+                "units_per_case": standardize_case_info(cols[header_mapping.index("Unit/Case")]) if "Unit/Case" in header_mapping else "",
+            })
+    product_data["table_data"] = table_data
+
+    if raw["details"] is not None:
+        raw_details = {clean_text(key): clean_text(value) for key, value in raw["details"]}
+        attach_variant_details(table_data, raw_details)
+    else:
+        for row in table_data:
+            row["details"] = {}
+
+    for key, value in record.items():
+        if key not in product_data and key != "raw":
+            product_data[key] = value
+    return product_data
@@ -0,0 +1,104 @@
+"""
+Persistent crawl state for incremental keeco_scraper runs.
+
+A small SQLite database keyed by product URL records when each product was
+last fetched, a hash of its #product-content markup, the HTTP validators
+(ETag / Last-Modified) the server sent, and the parsed product record.
+Later runs use it to skip recently fetched products, revalidate the rest
+with conditional requests, and only re-parse pages whose content changed.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def content_hash(fragment):
+    """SHA-256 of a serialized HTML fragment (str or bytes)."""
+    if isinstance(fragment, str):
+        fragment = fragment.encode("utf-8")
+    return hashlib.sha256(fragment).hexdigest()
+
+
+class CrawlState:
+    """URL-keyed crawl state store, safe to share between crawl worker threads."""
+
+    def __init__(self, path="crawl_state.sqlite3", max_age_hours=0):
+        self.path = path
+        self.max_age = max_age_hours * 3600
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_state (
+                url TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                product_json TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+        # How each product was resolved during this run
+        self.counts = {"skipped": 0, "not_modified": 0, "unchanged": 0, "changed": 0, "new": 0}
+
+    def get(self, url):
+        """Return the stored entry for url as a dict, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fetched_at, content_hash, etag, last_modified, product_json "
+                "FROM crawl_state WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "url": url,
+            "fetched_at": row[0],
+            "content_hash": row[1],
+            "etag": row[2],
+            "last_modified": row[3],
+            "product": json.loads(row[4]),
+        }
+
+    def is_fresh(self, entry):
+        """Whether entry was fetched recently enough to reuse without a request."""
+        return bool(self.max_age) and time.time() - entry["fetched_at"] < self.max_age
+
+    def touch(self, url, outcome, etag=None, last_modified=None):
+        """Record that url was confirmed unchanged ("not_modified" or "unchanged")."""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE crawl_state SET fetched_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+                "WHERE url = ?",
+                (time.time(), etag, last_modified, url),
+            )
+            self.conn.commit()
+            self.counts[outcome] += 1
+
+    def record_skip(self):
+        with self.lock:
+            self.counts["skipped"] += 1
+
+    def save(self, url, page_hash, product, etag=None, last_modified=None, is_new=False):
+        """Store a freshly parsed product."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO crawl_state "
+                "(url, fetched_at, content_hash, etag, last_modified, product_json) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, time.time(), page_hash, etag, last_modified, json.dumps(product)),
+            )
+            self.conn.commit()
+            self.counts["new" if is_new else "changed"] += 1
+
+    def summary(self):
+        return ", ".join(f"{count} {outcome.replace('_', ' ')}" for outcome, count in self.counts.items())
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
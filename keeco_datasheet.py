@@ -1,66 +1,38 @@
 import pandas as pd
-import re
+import numpy as np
 import psycopg2
-from psycopg2.extras import execute_values
 from dotenv import dotenv_values
+import argparse
+import html
 import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import islice
+from openpyxl import load_workbook
+from pandas._libs.parsers import STR_NA_VALUES
+from keeco_db import upsert_rows
+from keeco_profile import Profiler
 
-# Load environment variables from .env file
-env_path = r"C:\\Users\\juddu\\Downloads\\PAM\\Staging Area\\Keeco\\.env"
-config = dotenv_values(env_path)
-
-# Database connection details
-DB_NAME = config['DB_NAME']
-DB_USER = config['DB_USER']
-DB_PASSWORD = config['DB_PASSWORD']
-DB_HOST = config['DB_HOST']
-DB_PORT = config['DB_PORT']
-
-# Define the file path
-file_path = r"C:\\Users\\juddu\\Downloads\\PAM\\Staging Area\\Keeco\\Hospitality General Line Price List New Hookless Pricing 110624 final.xlsx"
-
-# Load the Excel file
+# Defaults for the command line: sheet and target table
 sheet_name = "keeco"
-df = pd.read_excel(file_path, sheet_name=sheet_name)
-
-# Cleaning and normalizing the data
-# Step 1: Drop empty columns and rows
-df = df.dropna(how='all', axis=0)
-df = df.dropna(how='all', axis=1)
-
-# Step 2: Handle duplicates
-df = df.drop_duplicates()
-
-# Step 3: Ensure proper data types for specific columns
-df['case_length'] = pd.to_numeric(df.get('Case Length', pd.Series(dtype='float')), errors='coerce')
-df['case_width'] = pd.to_numeric(df.get('Case Width', pd.Series(dtype='float')), errors='coerce')
-df['case_height'] = pd.to_numeric(df.get('Case Height', pd.Series(dtype='float')), errors='coerce')
-df['case_pack'] = pd.to_numeric(df.get('Case Pack', pd.Series(dtype='int')), errors='coerce')
-df['price_each_fob'] = pd.to_numeric(df.get('Price Each (FOB Plant)', pd.Series(dtype='float')), errors='coerce')
-df['liner'] = df.get('Liner (Yes or No)', '').str.lower().map({'yes': True, 'no': False})
-
-# Convert 'liner' to boolean or None
-df['liner'] = df['liner'].map({True: True, False: False}).where(df['liner'].notna(), None)
+table_name = "manufactured.keeco"
 
-# Debugging: Check the 'liner' column values
-print("Liner column values:")
-print(df['liner'].unique())
+# Settings connect() needs, from the .env file or the environment
+DB_SETTINGS = ("DB_NAME", "DB_USER", "DB_PASSWORD", "DB_HOST", "DB_PORT")
 
-# Step 4: Create 'specs' column
+# Columns collected into the 'specs' JSON object
 specs_columns = [
     'Thread Count / GSM', 'Materal ', 'Edge Designs', 'Fabric Treatments',
     'Quilting Designs', 'Specialized Features'
 ]
-df['specs'] = df[specs_columns].apply(lambda row: row.dropna().to_dict(), axis=1)
-
-# Convert 'specs' to JSON strings for database insertion
-df['specs'] = df['specs'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else x)
 
-# Drop unused columns
+# Unused columns, dropped once their values are converted
 columns_to_drop = specs_columns + [
     'Case Length', 'Case Width', 'Case Height', 'Case Pack', 'Price Each (FOB Plant)', 'Liner (Yes or No)'
 ]
-df = df.drop(columns=columns_to_drop)
 
 # Rename columns to match database schema
 column_mapping = {
@@ -72,58 +44,633 @@ column_mapping = {
     'Size': 'size',
     'Fill Weight': 'fill_weight',
 }
-df.rename(columns=column_mapping, inplace=True)
 
-# Step 5: Remove ™ and ® symbols from all text columns
-def clean_symbols(value):
+# Sheet columns the cleaning reads or renames
+source_columns = set(column_mapping) | set(columns_to_drop)
+
+# Inferred column types that can hold string cells
+TEXT_TYPES = {"string", "mixed", "mixed-integer"}
+
+# Cell texts pd.read_excel reads as missing values (pandas' default na_values)
+NA_STRINGS = frozenset(STR_NA_VALUES)
+
+# Cells of a worksheet's XML, for scan_column_types
+# (column letters, row, type, contents); the attributes may come in any order
+CELL = re.compile(rb'<c\b(?=[^>]*\br="([A-Z]+)(\d+)")(?=(?:[^>]*\bt="(\w+)")?)[^>]*?(?:/>|>(.*?)</c>)', re.S)
+CELL_VALUE = re.compile(rb'<v>([^<]*)</v>')
+INLINE_TEXT = re.compile(rb'<t\b[^>]*>([^<]*)</t>')
+EMPTY = object()
+MISSING = object()
+TEXT = object()
+
+
+def build_specs(df, columns):
+    """
+    Build the 'specs' JSON string of every row, one column at a time.
+
+    Gives the same text as json.dumps(row.dropna().to_dict()) for each row,
+    without creating a Series per row: each column's non-null cells are
+    encoded once as '"key": value, ' fragments and the fragments are
+    concatenated across columns.
+    """
+    # The same per-row values a row-wise apply would see
+    values = df[columns].to_numpy()
+    specs = np.full(len(df), "", dtype=object)
+    for position, column in enumerate(columns):
+        cells = values[:, position]
+        present = pd.notna(cells)
+        if not present.any():
+            continue
+        present_cells = cells[present]
+        inferred = pd.api.types.infer_dtype(present_cells)
+        if inferred == "string" or (inferred in ("floating", "integer") and not (present_cells == 0).any()):
+            # Encode each distinct value once (never with zeros, which would merge 0.0 and -0.0)
+            codes, uniques = pd.factorize(present_cells)
+            encoded = np.array([json.dumps(value) for value in uniques], dtype=object)[codes]
+        else:
+            encoded = np.array([json.dumps(value) for value in present_cells], dtype=object)
+        fragments = np.full(len(df), "", dtype=object)
+        fragments[present] = json.dumps(column) + ": " + encoded + ", "
+        specs = specs + fragments
+    # Drop the trailing ", " of each row's last fragment
+    return "{" + pd.Series(specs, index=df.index, dtype=object).str[:-2] + "}"
+
+
+def strip_symbols(values):
+    # Two literal replaces are cheaper per cell than one regex substitution
+    return values.str.replace("™", "", regex=False).str.replace("®", "", regex=False).str.strip()
+
+
+def clean_symbols(df, skip=()):
+    """Remove ™ and ® symbols and surrounding whitespace from every string cell, column by column."""
+    for column in df.columns:
+        if column in skip or df[column].dtype != object:
+            continue
+        values = df[column]
+        inferred = pd.api.types.infer_dtype(values)
+        if inferred == "string":
+            # Text columns repeat a few values (categories, collections); clean each distinct one once
+            codes, uniques = pd.factorize(values)
+            cleaned = strip_symbols(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+            df[column] = np.where(codes >= 0, cleaned.take(codes, mode="clip"), values.to_numpy(dtype=object))
+        elif inferred in TEXT_TYPES:
+            cleaned = strip_symbols(values)
+            # .str yields NaN for cells that are not strings; keep those as they were
+            df[column] = cleaned.where(cleaned.notna(), values)
+    return df
+
+
+def clean_price_list(df, chunked=False):
+    """
+    Clean a raw price list sheet into the manufactured.keeco columns.
+
+    With chunked=True, df is one chunk of a sheet: the columns the cleaning
+    reads are kept even when they have no values in this chunk, so every
+    chunk comes out with the same columns.
+    """
+    # Cleaning and normalizing the data
+    # Step 1: Drop empty columns and rows
+    df = df.dropna(how='all', axis=0)
+    if chunked:
+        empty = [column for column in df.columns if column not in source_columns and df[column].isna().all()]
+        df = df.drop(columns=empty)
+    else:
+        df = df.dropna(how='all', axis=1)
+
+    # Step 2: Handle duplicates
+    df = df.drop_duplicates()
+
+    # Step 3: Ensure proper data types for specific columns
+    df['case_length'] = pd.to_numeric(df.get('Case Length', pd.Series(dtype='float')), errors='coerce')
+    df['case_width'] = pd.to_numeric(df.get('Case Width', pd.Series(dtype='float')), errors='coerce')
+    df['case_height'] = pd.to_numeric(df.get('Case Height', pd.Series(dtype='float')), errors='coerce')
+    df['case_pack'] = pd.to_numeric(df.get('Case Pack', pd.Series(dtype='int')), errors='coerce')
+    df['price_each_fob'] = pd.to_numeric(df.get('Price Each (FOB Plant)', pd.Series(dtype='float')), errors='coerce')
+    df['liner'] = df.get('Liner (Yes or No)', '').str.lower().map({'yes': True, 'no': False})
+
+    # Convert 'liner' to boolean or None
+    df['liner'] = df['liner'].map({True: True, False: False}).where(df['liner'].notna(), None)
+
+    # Step 4: Create 'specs' column as JSON strings for database insertion
+    df['specs'] = build_specs(df, specs_columns)
+
+    # Drop unused columns
+    df = df.drop(columns=columns_to_drop)
+    df = df.rename(columns=column_mapping)
+
+    # Step 5: Remove ™ and ® symbols from all text columns
+    # ('specs' is ASCII-only JSON, so it has none to remove)
+    return clean_symbols(df, skip=('specs',))
+
+def text_number(text):
+    """
+    Classify a cell's text the way pd.read_excel reads it.
+
+    Returns a float for numeric text, EMPTY for "", MISSING for one of
+    pandas' NA strings, or TEXT for anything else.
+    """
+    if text == "":
+        return EMPTY
+    if text in NA_STRINGS:
+        return MISSING
+    try:
+        return float(text)
+    except ValueError:
+        return TEXT
+
+
+def cell_number(cell_type, body, shared_numbers):
+    """Classify a raw sheet cell as text_number does its text; numbers are floats."""
+    if cell_type == b"inlineStr":
+        return text_number(html.unescape(b"".join(INLINE_TEXT.findall(body or b"")).decode("utf-8")))
+    value = CELL_VALUE.search(body) if body else None
+    if value is None:
+        return EMPTY
+    if cell_type is None or cell_type == b"n":
+        return float(value.group(1))
+    if cell_type == b"s":
+        return shared_numbers[int(value.group(1))]
+    if cell_type in (b"str", b"e"):
+        return text_number(html.unescape(value.group(1).decode("utf-8")))
+    # Booleans and ISO dates
+    return TEXT
+
+
+def value_number(value):
+    """Classify a cell value read by openpyxl as cell_number classifies a raw cell."""
+    if value is None:
+        return EMPTY
     if isinstance(value, str):
-        return re.sub(r"[™®]", "", value).strip()
-    return value
+        return text_number(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    # Booleans, dates and times
+    return TEXT
+
+
+def add_cell(stats, index, number):
+    """Count one classified data cell into stats (column index -> [numeric cells, any fraction, any text])."""
+    column = stats.get(index)
+    if column is None:
+        column = stats[index] = [0, False, False]
+    if number is TEXT:
+        column[2] = True
+    else:
+        column[0] += 1
+        if not column[1] and not number.is_integer():
+            column[1] = True
+
+
+def scan_column_types(workbook, sheet):
+    """
+    Return {column index: "int", "float" or "text"} as pd.read_excel would type each column of a sheet.
+
+    pd.read_excel decides a column's type from all of its cells: numbers
+    without gaps are int64, numbers with gaps or fractions float64, and
+    anything else object. A chunk only sees some of the cells, so the sheet
+    is scanned first. The sheet XML is scanned directly when openpyxl
+    exposes it (much faster than parsing it); otherwise the rows are read
+    with iter_rows.
+    """
+    worksheet = workbook[sheet]
+    scanned = _scan_sheet_xml(workbook, worksheet)
+    if scanned is None:
+        scanned = _scan_sheet_rows(worksheet)
+    stats, last_row = scanned
+    data_rows = last_row - 1
+    types = {}
+    for index, (numbers, fractional, text) in stats.items():
+        if text:
+            types[index] = "text"
+        elif numbers:
+            types[index] = "float" if fractional or numbers < data_rows else "int"
+    return types
+
+
+def _scan_sheet_rows(worksheet):
+    """(stats, last row) of a sheet, from its cell values."""
+    stats = {}
+    last_row = 1
+    for row, values in enumerate(worksheet.iter_rows(values_only=True), start=1):
+        for index, value in enumerate(values):
+            number = value_number(value)
+            if number is EMPTY:
+                continue
+            # pandas drops trailing rows of empty cells, but not of NA strings
+            last_row = row
+            if row > 1 and number is not MISSING:
+                add_cell(stats, index, number)
+    return stats, last_row
+
+
+def _scan_sheet_xml(workbook, worksheet, block_size=1 << 20):
+    """
+    (stats, last row) of a sheet, from a regex scan of its XML a block at a time.
+
+    This reads the internals of openpyxl's read-only workbooks (the open
+    archive, the sheet's path in it and its shared strings), so it returns
+    None when they are missing, as it does for cells without references.
+    """
+    archive = getattr(workbook, "_archive", None)
+    sheet_path = getattr(worksheet, "_worksheet_path", None)
+    shared_strings = getattr(worksheet, "_shared_strings", None)
+    if archive is None or sheet_path is None or shared_strings is None:
+        return None
+    shared_numbers = [text_number(str(text)) for text in shared_strings]
+    columns = {}
+    stats = {}
+    last_row = 1
+    with archive.open(sheet_path) as xml:
+        pending = b""
+        while True:
+            block = xml.read(block_size)
+            data = pending + block
+            # Only scan complete rows; the rest waits for the next block
+            end = data.rfind(b"</row>") + len(b"</row>") if block else len(data)
+            data, pending = data[:end], data[end:]
+            cells = 0
+            for letters, row, cell_type, body in CELL.findall(data):
+                cells += 1
+                if not body:
+                    continue
+                row = int(row)
+                index = columns.get(letters)
+                if index is None:
+                    index = columns[letters] = column_index(letters)
+                column = stats.get(index)
+                if column is not None and column[2] and row <= last_row:
+                    # Nothing left to learn from a text column's cell
+                    continue
+                number = cell_number(cell_type or None, body, shared_numbers)
+                if number is EMPTY:
+                    continue
+                # pandas drops trailing rows of empty cells, but not of NA strings
+                if row > last_row:
+                    last_row = row
+                if row > 1 and number is not MISSING:
+                    add_cell(stats, index, number)
+            if cells != data.count(b"<c ") + data.count(b"<c>"):
+                return None
+            if not block:
+                break
+    return stats, last_row
+
+
+def column_index(letters):
+    """0-based index of a column reference such as b"A" or b"AB"."""
+    index = 0
+    for letter in letters:
+        index = index * 26 + letter - 64
+    return index - 1
 
-df = df.applymap(clean_symbols)
 
-# Debugging: Ensure all columns have correct data types
-print("DataFrame dtypes:")
-print(df.dtypes)
-print("Preview of cleaned data:")
-print(df.head())
+def as_read_excel(values):
+    # pd.read_excel keeps whole-number floats of text columns as ints
+    return [int(value) if isinstance(value, float) and value.is_integer() else value for value in values]
+
+
+def typed_chunk(rows, columns, keep, types):
+    """DataFrame of raw sheet rows with the column types pd.read_excel gives the whole sheet."""
+    df = pd.DataFrame(
+        [[row[index] if index < len(row) else None for index in keep] for row in rows],
+        columns=columns, dtype=object,
+    )
+    for position, index in enumerate(keep):
+        values = df.iloc[:, position]
+        values = values.where(~values.isin(NA_STRINGS), None)
+        column_type = types.get(index)
+        if column_type in ("int", "float"):
+            try:
+                values = pd.to_numeric(values).astype("int64" if column_type == "int" else "float64")
+            except (TypeError, ValueError):
+                # e.g. date cells, which openpyxl returns as datetimes
+                values = values.infer_objects()
+        elif column_type == "text":
+            values = pd.Series(as_read_excel(values), index=df.index, dtype=object)
+        df.isetitem(position, values)
+    return df
+
+
+def read_sheet_chunks(path, sheet, chunk_rows):
+    """
+    Yield a sheet as DataFrames of at most chunk_rows rows.
+
+    The workbook is opened read-only, so openpyxl parses the sheet XML as
+    rows are requested instead of building the whole sheet in memory. The
+    first row is the header; columns without a header are skipped. Cells
+    are read as pd.read_excel reads them (pandas' NA strings such as "NA"
+    and "N/A" become None, and each column gets its whole-sheet type), so
+    a streamed load writes the same rows as a whole-sheet one.
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        types = scan_column_types(workbook, sheet)
+        rows = workbook[sheet].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        keep = [index for index, name in enumerate(header) if name is not None]
+        columns = [header[index] for index in keep]
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                break
+            yield typed_chunk(chunk, columns, keep, types)
+    finally:
+        workbook.close()
+
+
+def load_sheet(path, sheet, cache=None):
+    """Read a whole price list sheet, from the cache when the workbook is unchanged."""
+    if cache is None:
+        return pd.read_excel(path, sheet_name=sheet)
+    key = cache.key(path, sheet)
+    df = cache.read(key)
+    if df is not None:
+        print(f"Loaded sheet '{sheet}' from cache {cache.path(key)}")
+        return df
+    df = pd.read_excel(path, sheet_name=sheet)
+    if not cache.write(key, df):
+        print(f"Sheet '{sheet}' holds values the cache cannot store; it will be parsed again next time.")
+    return df
+
+
+def clean_chunks(path, sheet, chunk_rows, cache=None):
+    """
+    Yield the cleaned chunks of a price list sheet.
+
+    Chunks come from the cache when it holds the sheet (a whole-sheet load
+    fills it), otherwise from the workbook itself.
+    """
+    chunks = cache.iter_chunks(cache.key(path, sheet), chunk_rows) if cache is not None else None
+    if chunks is None:
+        chunks = read_sheet_chunks(path, sheet, chunk_rows)
+    else:
+        print(f"Streaming sheet '{sheet}' from cache")
+        # pd.read_excel names columns without a header "Unnamed: N"; the workbook reader skips them
+        chunks = (chunk.loc[:, ~chunk.columns.astype(str).str.startswith('Unnamed: ')] for chunk in chunks)
+    for chunk in chunks:
+        yield clean_price_list(chunk, chunked=True)
+
+
+def connect(config):
+    return psycopg2.connect(
+        dbname=config['DB_NAME'],
+        user=config['DB_USER'],
+        password=config['DB_PASSWORD'],
+        host=config['DB_HOST'],
+        port=config['DB_PORT']
+    )
+
+
+def prepare_rows(df):
+    # NaN is not a valid value for integer columns; load missing values as NULL
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
 
 # Insert data into PostgreSQL
-def insert_to_db(df, table_name):
+def insert_to_db(df, table_name, config, debug=False):
+    values = prepare_rows(df)
+
+    if debug:
+        # Debug: Print first few rows to ensure compatibility
+        print("Prepared rows for insertion:")
+        for value in values[:5]:
+            print(value)
+
     # Define the connection
-    conn = psycopg2.connect(
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        port=DB_PORT
+    conn = connect(config)
+    try:
+        # Upsert on SKU, rewriting only rows whose content changed
+        counts = upsert_rows(conn, table_name, values, conflict_column="sku")
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"Data loaded into {table_name}: {counts['inserted']} inserted, "
+          f"{counts['updated']} updated, {counts['unchanged']} unchanged.")
+    return counts
+
+
+def stream_to_db(path, sheet, table_name, config, chunk_rows, cache=None):
+    """
+    Clean and load a price list sheet chunk by chunk.
+
+    A reader thread parses and cleans the next chunk while the current one
+    is copied into the database, so at most two chunks are held in memory.
+    Each chunk is committed once loaded. Rows duplicated across chunks are
+    not dropped here; upsert_rows keeps the last row for each SKU.
+
+    Returns the total counts from upsert_rows plus the number of rows read.
+    """
+    conn = connect(config)
+    totals = {'rows': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+    chunks = clean_chunks(path, sheet, chunk_rows, cache)
+    try:
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            pending = reader.submit(next, chunks, None)
+            number = 0
+            while True:
+                df = pending.result()
+                if df is None:
+                    break
+                # Read the next chunk while this one loads
+                pending = reader.submit(next, chunks, None)
+                number += 1
+                counts = upsert_rows(conn, table_name, prepare_rows(df), conflict_column="sku")
+                conn.commit()
+                counts['rows'] = len(df)
+                for key in totals:
+                    totals[key] += counts[key]
+                print(f"Chunk {number}: {len(df)} rows, {counts['inserted']} inserted, "
+                      f"{counts['updated']} updated, {counts['unchanged']} unchanged.")
+    finally:
+        chunks.close()
+        conn.close()
+    print(f"Data loaded into {table_name}: {totals['inserted']} inserted, "
+          f"{totals['updated']} updated, {totals['unchanged']} unchanged.")
+    return totals
+
+
+def print_debug_info(df):
+    # Debugging: Check the 'liner' column values
+    print("Liner column values:")
+    print(df['liner'].unique())
+
+    # Debugging: Ensure all columns have correct data types
+    print("DataFrame dtypes:")
+    print(df.dtypes)
+    print("Preview of cleaned data:")
+    print(df.head())
+
+
+def process_sheet(path, sheet, table_name, config, chunk_rows=0, cache=None, load=True, debug=False):
+    """
+    Read, clean and (unless load is False) upsert one price list sheet.
+
+    Returns a report dict with the sheet name, the number of cleaned rows,
+    the seconds spent in each step and the upsert counts. A streamed sheet
+    reads, cleans and loads at the same time, so it only reports a total.
+    """
+    report = {'sheet': sheet}
+    start = time.perf_counter()
+    if chunk_rows > 0:
+        if load:
+            totals = stream_to_db(path, sheet, table_name, config, chunk_rows, cache)
+            report['rows'] = totals.pop('rows')
+            report['counts'] = totals
+        else:
+            report['rows'] = sum(len(df) for df in clean_chunks(path, sheet, chunk_rows, cache))
+        report['stream_s'] = time.perf_counter() - start
+        return report
+
+    df = load_sheet(path, sheet, cache)
+    report['read_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = clean_price_list(df)
+    report['clean_s'] = time.perf_counter() - start
+    report['rows'] = len(df)
+    if debug:
+        print_debug_info(df)
+
+    if load:
+        # Insert the data into the database
+        start = time.perf_counter()
+        report['counts'] = insert_to_db(df, table_name, config, debug)
+        report['load_s'] = time.perf_counter() - start
+    return report
+
+
+def process_workbook(path, sheets, table_name, config, chunk_rows=0, cache_dir=None, load=True, debug=False):
+    """
+    Process the given sheets of one workbook in order.
+
+    Runs in a worker process when several workbooks are processed at once,
+    so it takes only picklable arguments and opens its own cache and
+    database connections. Returns a report dict for format_report.
+    """
+    cache = None
+    if cache_dir:
+        # Imported here so runs without a cache do not load pyarrow
+        try:
+            from keeco_sheet_cache import SheetCache
+        except ImportError as e:
+            print(f"Warning: sheet cache disabled, it could not be loaded: {e}")
+        else:
+            cache = SheetCache(cache_dir)
+    start = time.perf_counter()
+    reports = [
+        process_sheet(path, sheet, table_name, config, chunk_rows, cache, load, debug)
+        for sheet in sheets
+    ]
+    return {'workbook': path, 'sheets': reports, 'total_s': time.perf_counter() - start}
+
+
+def format_report(report):
+    """Timing report of process_workbook as printable lines."""
+    lines = [f"{report['workbook']}: {report['total_s']:.2f} s"]
+    for sheet in report['sheets']:
+        if 'stream_s' in sheet:
+            steps = f"streamed {sheet['stream_s']:.2f} s"
+        else:
+            steps = ", ".join(
+                f"{step} {sheet[key]:.2f} s"
+                for step, key in (('read', 'read_s'), ('clean', 'clean_s'), ('load', 'load_s'))
+                if key in sheet
+            )
+        line = f"  sheet '{sheet['sheet']}': {sheet['rows']} rows; {steps}"
+        if 'counts' in sheet:
+            counts = sheet['counts']
+            line += (f"; {counts['inserted']} inserted, {counts['updated']} updated, "
+                     f"{counts['unchanged']} unchanged")
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def run_workbooks(paths, sheets, workers, options):
+    """
+    Yield (path, report) for each workbook as it finishes, or (path, exception) if it failed.
+
+    With more than one worker, workbooks are processed in a process pool;
+    otherwise they run one after another in this process.
+    """
+    if workers <= 1:
+        for path in paths:
+            try:
+                yield path, process_workbook(path, sheets, **options)
+            except Exception as e:
+                yield path, e
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_workbook, path, sheets, **options): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Clean Keeco price list workbooks and load them into PostgreSQL.")
+    parser.add_argument("workbooks", nargs="+", metavar="WORKBOOK", help="price list .xlsx files")
+    parser.add_argument("--sheet", dest="sheets", action="append",
+                        help=f"sheet to load from every workbook; repeat for several (default: {sheet_name})")
+    parser.add_argument("--env", default=".env",
+                        help=".env file with the DB_* settings (default: %(default)s)")
+    parser.add_argument("--table", default=table_name, help="target table (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="workbooks processed at once in separate processes (default: one per workbook, "
+                             "up to the CPU count)")
+    parser.add_argument("--chunk-rows", type=int,
+                        help="stream sheets in chunks of this many rows (default: KEECO_CHUNK_ROWS, or 0 for whole sheets)")
+    parser.add_argument("--cache-dir",
+                        help="parsed sheet cache directory, empty to disable (default: KEECO_CACHE_DIR or .keeco_cache)")
+    parser.add_argument("--no-db", action="store_true", help="read and clean only, without loading into the database")
+    parser.add_argument("--debug", action="store_true", help="print previews of the cleaned data")
+    parser.add_argument("--profile", nargs="?", const="datasheet_profile", metavar="PREFIX",
+                        help="profile the run and write PREFIX.collapsed, PREFIX.pstats and PREFIX.alloc.txt; "
+                             "workbooks are then processed one at a time in this process (default prefix: %(const)s)")
+    args = parser.parse_args(argv)
+    args.sheets = args.sheets or [sheet_name]
+    # Settings from the environment take precedence over the .env file
+    args.config = {**dotenv_values(args.env), **os.environ}
+    missing = [key for key in DB_SETTINGS if key not in args.config]
+    if missing and not args.no_db:
+        parser.error(f"missing database settings {', '.join(missing)}; "
+                     f"set them in {args.env} or the environment, or pass --no-db")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = args.config
+
+    # Rows per chunk for streaming ingestion; 0 reads the whole sheet at once
+    chunk_rows = args.chunk_rows if args.chunk_rows is not None else int(config.get('KEECO_CHUNK_ROWS') or 0)
+    # Parsed sheets are cached here by workbook hash; empty disables the cache
+    cache_dir = args.cache_dir if args.cache_dir is not None else config.get('KEECO_CACHE_DIR', '.keeco_cache')
+
+    options = dict(
+        table_name=args.table, config=config, chunk_rows=chunk_rows,
+        cache_dir=cache_dir, load=not args.no_db, debug=args.debug,
     )
-    cursor = conn.cursor()
-
-    # Define the columns to insert
-    columns = list(df.columns)
-    values = df.to_dict(orient='records')
-
-    # Debug: Print first few rows to ensure compatibility
-    print("Prepared rows for insertion:")
-    for value in values[:5]:
-        print(value)
-
-    # SQL statement
-    sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES %s ON CONFLICT (sku) DO NOTHING"
-    
-    # Prepare the data for insertion
-    data_to_insert = [tuple(row[col] for col in columns) for row in values]
-    
-    # Execute batch insert
-    execute_values(cursor, sql, data_to_insert)
-    
-    # Commit and close connection
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print(f"Data inserted into {table_name} successfully.")
-
-# Insert the data into the database
-table_name = "manufactured.keeco"
-insert_to_db(df, table_name)
+    workers = args.workers or min(len(args.workbooks), os.cpu_count() or 1)
+    # The profilers only see this process
+    profiler = Profiler(args.profile).start() if args.profile else None
+    if profiler:
+        workers = 1
+    failures = 0
+    try:
+        for path, outcome in run_workbooks(args.workbooks, args.sheets, workers, options):
+            if isinstance(outcome, Exception):
+                failures += 1
+                print(f"{path}: failed: {outcome!r}")
+            else:
+                print(format_report(outcome))
+    finally:
+        if profiler:
+            profiler.stop()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
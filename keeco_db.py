@@ -0,0 +1,126 @@
+"""
+Shared PostgreSQL loading helpers for keeco_scraper and keeco_datasheet.
+
+upsert_rows streams rows with COPY into a temporary staging table and merges
+them into the target table on a unique key. Every row carries a row_hash of
+its loaded values, and existing rows are only updated when that hash
+changes, so the updated_at trigger fires only for real changes.
+"""
+import csv
+import hashlib
+import io
+import json
+from itertools import chain, islice
+
+from psycopg2 import sql
+
+STAGING_TABLE = "keeco_staging"
+
+
+def table_identifier(table_name):
+    """sql.Identifier for a possibly schema-qualified name like "manufactured.keeco"."""
+    return sql.Identifier(*table_name.split("."))
+
+
+def copy_value(value):
+    """Render a Python value as a COPY CSV field (None becomes the \\N null marker)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    if isinstance(value, float) and value.is_integer():
+        # pandas keeps integer columns with gaps as float64; COPY into an
+        # INTEGER column accepts "12" but not "12.0"
+        return int(value)
+    return value
+
+
+def row_hash(values):
+    """MD5 of a row's values, used to detect rows whose content changed."""
+    payload = json.dumps([copy_value(value) for value in values], default=str)
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+
+def upsert_rows(conn, table_name, data, conflict_column="sku", batch_size=5000):
+    """
+    Bulk-upsert rows into a table, updating only rows whose content changed.
+
+    Rows are copied into a temporary staging table one batch at a time and
+    merged with a single INSERT ... ON CONFLICT ... DO UPDATE ... WHERE the
+    stored row_hash differs. If the same key appears more than once, the
+    last row wins. The caller owns the transaction and must commit.
+
+    Args:
+        conn: An open psycopg2 connection.
+        table_name (str): Target table, e.g. "manufactured.keeco". It must
+            have a row_hash column.
+        data (iterable of dict): Rows to load; every row must have the same keys.
+        conflict_column (str): Unique column used to match existing rows.
+        batch_size (int): Number of rows copied and merged per batch.
+
+    Returns:
+        dict: Counts of "inserted", "updated" and "unchanged" rows.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    rows = iter(data)
+    first_row = next(rows, None)
+    if first_row is None:
+        return counts
+    columns = list(first_row.keys())
+    loaded_columns = columns + ["row_hash"]
+    rows = chain([first_row], rows)
+
+    table = table_identifier(table_name)
+    staging = sql.Identifier(STAGING_TABLE)
+    fields = sql.SQL(", ").join(map(sql.Identifier, loaded_columns))
+    key = sql.Identifier(conflict_column)
+    create_staging = sql.SQL(
+        "CREATE TEMP TABLE {staging} AS SELECT {fields} FROM {table} WITH NO DATA; "
+        "ALTER TABLE {staging} ADD COLUMN load_order BIGSERIAL"
+    ).format(staging=staging, fields=fields, table=table)
+    copy_query = sql.SQL(
+        "COPY {staging} ({fields}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    ).format(staging=staging, fields=fields)
+    merge_query = sql.SQL(
+        "WITH merged AS ("
+        "INSERT INTO {table} AS target ({fields}) "
+        "SELECT DISTINCT ON ({key}) {fields} FROM {staging} ORDER BY {key}, load_order DESC "
+        "ON CONFLICT ({key}) DO UPDATE SET {updates} "
+        "WHERE target.row_hash IS DISTINCT FROM EXCLUDED.row_hash "
+        "RETURNING (xmax = 0) AS inserted"
+        ") SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged"
+    ).format(
+        table=table,
+        fields=fields,
+        key=key,
+        staging=staging,
+        updates=sql.SQL(", ").join(
+            sql.SQL("{col} = EXCLUDED.{col}").format(col=sql.Identifier(column))
+            for column in loaded_columns if column != conflict_column
+        ),
+    )
+
+    with conn.cursor() as cursor:
+        cursor.execute(create_staging)
+        copy_statement = copy_query.as_string(conn)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in batch:
+                values = [row.get(column) for column in columns]
+                writer.writerow([copy_value(value) for value in values] + [row_hash(values)])
+            buffer.seek(0)
+            cursor.copy_expert(copy_statement, buffer)
+
+            cursor.execute(merge_query)
+            inserted, updated = cursor.fetchone()
+            distinct_keys = len({row.get(conflict_column) for row in batch})
+            counts["inserted"] += inserted
+            counts["updated"] += updated
+            counts["unchanged"] += distinct_keys - inserted - updated
+            cursor.execute(sql.SQL("TRUNCATE {staging}").format(staging=staging))
+        cursor.execute(sql.SQL("DROP TABLE {staging}").format(staging=staging))
+    return counts
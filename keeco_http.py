@@ -0,0 +1,261 @@
+"""
+HTTP fetch backends for keeco_scraper.
+
+Both backends log in once through Selenium and then reuse the browser's
+cookies and User-Agent to fetch product pages as raw server-rendered HTML:
+
+- HttpFetcher: a pooled requests.Session with keep-alive connections.
+- AsyncCrawler: asyncio/aiohttp fetching with a concurrency cap and an
+  adaptive per-host token bucket that follows observed server latency.
+"""
+import asyncio
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from keeco_metrics import metrics
+
+# Give up on HTTP for the rest of the run after this many misses in a row
+# (e.g. the site started serving a bot check instead of product pages).
+MAX_CONSECUTIVE_MISSES = 5
+
+# html is None when not_modified is True (the server answered 304)
+FetchResult = namedtuple("FetchResult", ["html", "etag", "last_modified", "not_modified"])
+
+
+def conditional_headers(etag=None, last_modified=None):
+    """Request headers for revalidating a previously fetched page."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def browser_identity(driver):
+    """Return (cookies, user_agent) from a logged-in WebDriver."""
+    cookies = driver.get_cookies()
+    user_agent = driver.execute_script("return navigator.userAgent")
+    return cookies, user_agent
+
+
+class HttpFetcher:
+    """Pooled HTTP client that reuses a logged-in WebDriver session."""
+
+    def __init__(self, pool_size=10, timeout=30):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.timeout = timeout
+        # Crawl worker threads refresh the cookies while others send requests
+        self.cookie_lock = threading.Lock()
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.consecutive_misses = 0
+
+    def load_cookies(self, driver):
+        """Copy cookies and User-Agent from a logged-in WebDriver."""
+        cookies, user_agent = browser_identity(driver)
+        # Fill a new jar and swap it in, so requests in flight never see a cleared one
+        jar = requests.cookies.RequestsCookieJar()
+        for cookie in cookies:
+            jar.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/"),
+            )
+        with self.cookie_lock:
+            self.session.cookies = jar
+            if user_agent:
+                self.session.headers["User-Agent"] = user_agent
+
+    def fetch(self, url, etag=None, last_modified=None):
+        """Return a FetchResult, or None if the request failed.
+
+        Passing the validators from a previous fetch makes the request
+        conditional, so an unchanged page costs a 304 with no body.
+        """
+        try:
+            with metrics.timer("http_fetch"):
+                response = self.session.get(
+                    url, headers=conditional_headers(etag, last_modified), timeout=self.timeout
+                )
+        except requests.RequestException as e:
+            print(f"DEBUG: HTTP fetch failed for {url}: {e}")
+            return None
+        if response.status_code == 304:
+            return FetchResult(None, etag, last_modified, True)
+        if response.status_code != 200:
+            print(f"DEBUG: HTTP fetch returned {response.status_code} for {url}")
+            return None
+        return FetchResult(
+            response.text,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            False,
+        )
+
+    def record_hit(self):
+        self.hits += 1
+        self.consecutive_misses = 0
+
+    def record_miss(self):
+        self.misses += 1
+        self.consecutive_misses += 1
+        if self.enabled and self.consecutive_misses >= MAX_CONSECUTIVE_MISSES:
+            print(f"HTTP fetch missed {self.consecutive_misses} pages in a row, using the browser only.")
+            self.enabled = False
+
+    def close(self):
+        self.session.close()
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate adapts to how the server responds.
+
+    The rate grows additively while responses are fast and is cut
+    multiplicatively on slow responses, 429s and 5xx errors. A Retry-After
+    header pauses the bucket outright.
+    """
+
+    def __init__(self, rate=4.0, burst=4, min_rate=0.2, max_rate=20.0, target_latency=1.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.resume_at = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.resume_at:
+                    await asyncio.sleep(self.resume_at - now)
+                    continue
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def record(self, latency, status):
+        """Adjust the rate after a response (status is None for network errors)."""
+        if status is None or status == 429 or status >= 500:
+            self.rate = max(self.min_rate, self.rate / 2)
+        elif latency > self.target_latency:
+            self.rate = max(self.min_rate, self.rate * 0.8)
+        else:
+            self.rate = min(self.max_rate, self.rate + 0.5)
+
+    def pause(self, seconds):
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+
+class AsyncCrawler:
+    """Fetch many product pages concurrently with the browser's session."""
+
+    def __init__(self, concurrency=8, rate=4.0, max_retries=3, timeout=30):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.cookies = {}
+        self.headers = {}
+        self.limiters = {}
+        self.pages_fetched = 0
+        self.pages_failed = 0
+
+    def load_cookies(self, driver):
+        """Copy cookies and User-Agent from a logged-in WebDriver."""
+        cookies, user_agent = browser_identity(driver)
+        self.cookies = {cookie["name"]: cookie["value"] for cookie in cookies}
+        if user_agent:
+            self.headers["User-Agent"] = user_agent
+
+    def limiter_for(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.limiters:
+            self.limiters[host] = AdaptiveRateLimiter(rate=self.rate, burst=self.concurrency)
+        return self.limiters[host]
+
+    async def _fetch(self, session, semaphore, url, validators):
+        limiter = self.limiter_for(url)
+        etag, last_modified = validators or (None, None)
+        headers = conditional_headers(etag, last_modified)
+        for attempt in range(self.max_retries):
+            await limiter.acquire()
+            async with semaphore:
+                start = time.monotonic()
+                status = None
+                retry_after = None
+                body = None
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        status = response.status
+                        retry_after = response.headers.get("Retry-After")
+                        response_validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                        body = await response.text()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"DEBUG: Async fetch attempt {attempt + 1} failed for {url}: {e}")
+                if status == 200 and not (body and body.strip()):
+                    # The body could not be read or was empty: retry like a network error
+                    print(f"DEBUG: Async fetch attempt {attempt + 1} got no page body for {url}")
+                    status = None
+                latency = time.monotonic() - start
+            limiter.record(latency, status)
+            metrics.observe("http_fetch", latency)
+            if attempt:
+                metrics.increment("retries")
+
+            if status == 200:
+                return FetchResult(body, *response_validators, False)
+            if status == 304:
+                return FetchResult(None, etag, last_modified, True)
+            if status is not None and status != 429 and status < 500:
+                print(f"DEBUG: Async fetch returned {status} for {url}")
+                return None
+            if retry_after and retry_after.isdigit():
+                limiter.pause(int(retry_after))
+        return None
+
+    async def _fetch_all(self, urls, validators):
+        # Limiters keep their learned rate between runs, but asyncio locks
+        # belong to a single event loop
+        for limiter in self.limiters.values():
+            limiter.lock = asyncio.Lock()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(
+            cookies=self.cookies, headers=self.headers, connector=connector, timeout=timeout
+        ) as session:
+            return await asyncio.gather(
+                *(self._fetch(session, semaphore, url, validators.get(url)) for url in urls)
+            )
+
+    def fetch_all(self, urls, validators=None):
+        """Fetch every URL and return a FetchResult (or None) for each, in order.
+
+        validators optionally maps a URL to the (etag, last_modified) pair
+        from a previous fetch, making that request conditional.
+        """
+        pages = asyncio.run(self._fetch_all(urls, validators or {}))
+        fetched = sum(1 for page in pages if page is not None)
+        self.pages_fetched += fetched
+        self.pages_failed += len(pages) - fetched
+        return pages
@@ -0,0 +1,178 @@
+"""
+Run metrics for keeco_scraper: per-stage timing histograms and counters.
+
+The crawl records how long each stage takes (page navigation, WebDriver
+waits, fixed sleeps, HTTP fetches, extraction, cleaning, CSV and database
+writes) and counts events such as retries, session refreshes and rows
+written. At the end of a run the metrics are written as JSON; during a long
+run they can also be served in the Prometheus text format from a local
+HTTP endpoint (serve()).
+
+Recording is a dict lookup and a few additions under a lock, so it is cheap
+enough to leave on for every product, and safe from crawl worker threads.
+"""
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds, from a cached parse to a page timeout
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """Count, sum, extremes and bucketed distribution of observed durations."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        # One slot per bucket plus a final one for values above the largest bound
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets + (self.max,), self.bucket_counts):
+            if count and seen + count >= rank:
+                upper = min(upper, self.max)
+                lower = max(lower, self.min)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.bucket_counts)},
+        }
+
+
+class Metrics:
+    """Named counters and per-stage duration histograms, safe to share between threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}
+        self.histograms = {}
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """Time the with-block under stage, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def snapshot(self):
+        """All metrics as a JSON-serializable dict."""
+        with self.lock:
+            return {
+                "started": self.started,
+                "elapsed_seconds": time.time() - self.started,
+                "counters": dict(sorted(self.counters.items())),
+                "stages": {stage: histogram.snapshot() for stage, histogram in sorted(self.histograms.items())},
+            }
+
+    def write_json(self, path, **extra):
+        """Write snapshot() to path, with any extra sections (e.g. clean_text statistics) added."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**self.snapshot(), **extra}, f, indent=2)
+            f.write("\n")
+
+    def report(self):
+        """One line per stage with its count, total, mean and p90 time, then the counters."""
+        snapshot = self.snapshot()
+        lines = [f"{'stage':<16}{'count':>8}{'total s':>10}{'mean ms':>10}{'p90 ms':>10}"]
+        for stage, stats in snapshot["stages"].items():
+            lines.append(f"{stage:<16}{stats['count']:>8}{stats['sum']:>10.1f}"
+                         f"{stats['mean'] * 1000:>10.1f}{stats['p90'] * 1000:>10.1f}")
+        lines.extend(f"{name}: {value}" for name, value in snapshot["counters"].items())
+        return "\n".join(lines)
+
+    def prometheus_text(self, prefix="keeco"):
+        """The metrics in the Prometheus text exposition format."""
+        with self.lock:
+            lines = []
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+            if self.histograms:
+                lines.append(f"# TYPE {prefix}_stage_seconds histogram")
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve /metrics on host:port from a daemon thread; returns the server (call shutdown() to stop)."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def clear(self):
+        with self.lock:
+            self.started = time.time()
+            self.counters.clear()
+            self.histograms.clear()
+
+
+metrics = Metrics()
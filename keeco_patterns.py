@@ -0,0 +1,126 @@
+"""
+Compiled regular expressions shared by the keeco detail parsers.
+
+Every pattern the parsers in keeco_cleaning use is compiled once here. The
+bed-size label alternation is defined once (SIZE_LABELS) and reused by every
+size-aware pattern, and size aliases ("qn", "kg", "cal king", ...) are
+canonicalized by one combined tokenizer instead of one substitution per size.
+"""
+import re
+from functools import lru_cache
+
+# Bed-size labels as they appear in detail text
+SIZE_LABELS = r"Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King"
+
+# A size label as a whole word ("Queen", but not "Queens")
+SIZE_WORD = re.compile(rf"\b(?:{SIZE_LABELS})\b")
+# A whole-word size label and its separator, introducing a size section
+SIZE_SECTION = re.compile(rf"\b({SIZE_LABELS})\b[:\s-]+")
+# A size label and its separator anywhere in the text (no word boundary)
+SIZE_SPLIT = re.compile(rf"(?:{SIZE_LABELS})[:\s-]+")
+# "<size> - <value>" at the start of a part, capturing the size and the value
+SIZE_PREFIX = re.compile(rf"({SIZE_LABELS})[:\s-]+(.+)", re.IGNORECASE)
+# "<size> - <value>" spanning a whole line
+SIZE_LINE = re.compile(rf"^({SIZE_LABELS})[:\s-]+(.+)$", re.IGNORECASE)
+
+# Size aliases in lowercase variant names, each mapped to its canonical label.
+# Longer aliases come first so "cal king" and "twin xl" win over "king" and "twin".
+SIZE_ALIAS = re.compile(
+    r"\b(?:"
+    r"(?P<california_king>cal(?:ifornia)?(?:\s*k(?:ing)?|\s+kg))"
+    r"|(?P<standard>std|standard)"
+    r"|(?P<king>kg|king)"
+    r"|(?P<queen>qn|queen)"
+    r"|(?P<full>full)"
+    r"|(?P<twin_xl>twin\s*xl)"
+    r"|(?P<twin>twin)"
+    r"|(?P<jumbo>jumbo)"
+    r"|(?P<euro>euro)"
+    r")\b",
+    re.IGNORECASE,
+)
+SIZE_ALIAS_NAMES = {
+    "california_king": "California King",
+    "standard": "Standard",
+    "king": "King",
+    "queen": "Queen",
+    "full": "Full",
+    "twin_xl": "Twin XL",
+    "twin": "Twin",
+    "jumbo": "Jumbo",
+    "euro": "Euro",
+}
+# A canonical size label produced by SIZE_ALIAS
+CANONICAL_SIZE = re.compile(r"\b(Standard|Queen|King|Twin XL|Twin|Full|California King|Jumbo|Euro)\b")
+
+
+def canonicalize_sizes(text):
+    """Replace every size alias in text with its canonical label, in one pass."""
+    return SIZE_ALIAS.sub(lambda match: SIZE_ALIAS_NAMES[match.lastgroup], text)
+
+
+@lru_cache(maxsize=1024)
+def size_token(text):
+    """Canonical size named in text ("cal king - firm" -> "California King"), or None."""
+    match = CANONICAL_SIZE.search(canonicalize_sizes(text))
+    return match.group(1) if match else None
+
+
+def iter_size_sections(text):
+    """
+    Split text into size sections in a single scan.
+
+    Yields (size_label, (start, end)) for each section, where size_label is
+    the label that introduces the section as written in the text. Text before
+    the first label is yielded with a size_label of None.
+    """
+    label = None
+    start = 0
+    for match in SIZE_SECTION.finditer(text):
+        yield label, (start, match.start())
+        label = match.group(1)
+        start = match.end()
+    yield label, (start, len(text))
+
+
+# clean_type_size
+TRADEMARKS = re.compile(r"[®™©]")
+PRODUCT_WORD_PREFIX = re.compile(r"^.*?(?:pillow|insert|cover|protector|pack|size)\s*[-:,]?\s*")
+BY_FROM_SUFFIX = re.compile(r"(?:by|from)\s+.*$")
+WHITESPACE = re.compile(r"\s+")
+DENSITY = re.compile(r"(soft|medium|firm)\s*(?:density|support)?", re.IGNORECASE)
+
+# Numbers and measurements
+NON_NUMERIC = re.compile(r"[^\d.]")
+HAS_DIGIT = re.compile(r"\d")
+FIRST_INTEGER = re.compile(r"(\d+)")
+FRACTION = re.compile(r"(\d+)\s*(?:-|and)?\s*(\d+)/(\d+)")
+
+_NUMBER = r"(\d+(?:\s*-?\s*\d+/\d+)?|\d+(?:\.\d+)?)"
+_UNIT = r"(?:\"|in(?:ch(?:es)?)?|'|feet)?"
+# extract_dimensions, tried in order: "20 x 26 x 4" style, then "L: 20" style
+DIMENSION_GROUP_PATTERNS = (
+    re.compile(
+        rf"{_NUMBER}\s*{_UNIT}\s*[xX]\s*"
+        rf"{_NUMBER}\s*{_UNIT}\s*"
+        rf"(?:[xX]\s*{_NUMBER}\s*{_UNIT})?",
+        re.IGNORECASE,
+    ),
+    re.compile(rf"(?:L|Length|W|Width|H|Height)\s*[=:]\s*{_NUMBER}\s*{_UNIT}", re.IGNORECASE),
+)
+# clean_dimensions: two or three numbers separated by x with optional inch marks
+DIMENSION_TRIPLE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(?:\"|inches?|'|[xX])+\s*(\d+(?:\.\d+)?)\s*(?:\"|inches?|')?"
+    r"(?:\s*[xX]\s*(\d+(?:\.\d+)?)\s*(?:\"|inches?|')?)?"
+)
+
+# Weights
+WEIGHT = re.compile(r"(\d+(?:\.\d+)?)\s*(?:oz\.?|ounces?|lbs?\.?|pounds?)", re.IGNORECASE)
+POUNDS = re.compile(r"(\d+(?:\.\d+)?)\s*(?:lbs?\.?|pounds?)", re.IGNORECASE)
+
+# Splitting detail values into parts
+DETAIL_PART_SPLIT = re.compile(r"[;,\n]|\s+(?=[A-Za-z]+:)")
+VARIANT_LINE_SPLIT = re.compile(r"[;\n]")
+
+# Image URLs up to and including ".jpg"
+JPG_URL = re.compile(r"(.*?\.jpg)")
@@ -0,0 +1,139 @@
+"""
+Profiling mode (--profile) for keeco_scraper and keeco_datasheet.
+
+Profiler wraps a run in three profilers and writes their results side by side:
+
+    PREFIX.collapsed   call stacks of every thread, sampled every few
+                       milliseconds, in the collapsed format read by
+                       flamegraph.pl, speedscope and inferno
+                       ("thread;frame;frame count" per line)
+    PREFIX.pstats      cProfile statistics of the main thread
+                       (python -m pstats, snakeviz)
+    PREFIX.alloc.txt   top allocation sites of a tracemalloc snapshot taken
+                       near peak traced memory, by allocating line and by the
+                       line of this project's code that led to the allocation
+
+The profilers slow the run down (tracemalloc the most), so timings from a
+profiled run are only comparable with other profiled runs.
+"""
+import cProfile
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def is_project_file(filename):
+    return filename.startswith(PROJECT_DIR) and "site-packages" not in filename and filename != __file__
+
+
+class Profiler:
+    """Sampling, cProfile and tracemalloc profiling of the code run between start() and stop()."""
+
+    def __init__(self, prefix="profile", interval=0.005, traceback_frames=25, top=30):
+        self.prefix = prefix
+        self.interval = interval
+        self.traceback_frames = traceback_frames
+        self.top = top
+        self.stacks = Counter()
+        self.profile = cProfile.Profile()
+        self.snapshot = None
+        self.snapshot_memory = 0
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def start(self):
+        tracemalloc.start(self.traceback_frames)
+        self.thread = threading.Thread(target=self._sample, name="keeco-profiler", daemon=True)
+        self.thread.start()
+        self.profile.enable()
+        return self
+
+    def _sample(self):
+        me = threading.get_ident()
+        ticks = 0
+        snapshot_every = max(int(1 / self.interval), 1)
+        while not self.stopping.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            ticks += 1
+            if ticks % snapshot_every == 0:
+                self._snapshot_if_larger()
+
+    def _snapshot_if_larger(self):
+        # Keep the snapshot with the most memory in use; most of a run's
+        # allocations are freed again by the time it ends
+        current, _ = tracemalloc.get_traced_memory()
+        if current > self.snapshot_memory * 1.1:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_memory = current
+
+    def stop(self):
+        """Stop profiling and write the result files; returns their paths."""
+        self.profile.disable()
+        self.stopping.set()
+        self.thread.join()
+        self._snapshot_if_larger()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        paths = [f"{self.prefix}.collapsed", f"{self.prefix}.pstats", f"{self.prefix}.alloc.txt"]
+        with open(paths[0], "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        self.profile.dump_stats(paths[1])
+        with open(paths[2], "w", encoding="utf-8") as f:
+            f.write(self.allocation_report(peak))
+        print(f"Profile written to {', '.join(paths)}")
+        return paths
+
+    def allocation_report(self, peak):
+        if self.snapshot is None:
+            return "No allocations were traced.\n"
+        snapshot = self.snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        lines = [
+            f"Traced memory: {self.snapshot_memory / 2**20:.1f} MiB in use at the snapshot, "
+            f"{peak / 2**20:.1f} MiB peak",
+            "",
+            f"Top {self.top} allocation sites in this project's code (innermost project line of each traceback):",
+        ]
+        by_project_line = Counter()
+        blocks = Counter()
+        for stat in snapshot.statistics("traceback"):
+            # Frames run from the oldest call to the allocating one
+            site = next((frame for frame in reversed(stat.traceback) if is_project_file(frame.filename)), None)
+            key = f"{os.path.basename(site.filename)}:{site.lineno}" if site else "(outside project code)"
+            by_project_line[key] += stat.size
+            blocks[key] += stat.count
+        for key, size in by_project_line.most_common(self.top):
+            lines.append(f"{size / 2**20:10.2f} MiB {blocks[key]:>10} blocks  {key}")
+        lines += ["", f"Top {self.top} allocating lines:"]
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 2**20:10.2f} MiB {stat.count:>10} blocks  {frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -1,253 +1,575 @@
+import argparse
 import sys
 import os
-import re
 import csv
-import psycopg2
-from psycopg2 import sql
-from dotenv import load_dotenv
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-import undetected_chromedriver as uc
-import unicodedata
-from ftfy import fix_text
+import json
 import time
+import queue
+import threading
+from collections import deque
+from functools import lru_cache
+from itertools import chain
+from concurrent.futures import Future, ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import lxml.etree
+import lxml.html
+from keeco_crawl_state import CrawlState, content_hash
+from keeco_checkpoint import CheckpointJournal
+from keeco_text import clean_text, normalizer
+from keeco_cleaning import clean_image_urls, clean_product
+# The cleaning helpers used to live here; keep `from keeco_scraper import ...` working
+from keeco_cleaning import (  # noqa: F401
+    clean_dimensions, clean_fill_weight, clean_shipping_info, clean_type_size, extract_dimensions,
+    merge_fill_weights, parse_details_by_variant, standardize_case_info, standardize_shipping_info,
+)
+from keeco_patterns import NON_NUMERIC
+from keeco_metrics import metrics
+from keeco_profile import Profiler
 
-# Load .env file
-dotenv_path = r'.env'
-load_dotenv(dotenv_path)
+# selenium, undetected_chromedriver, psycopg2, the HTTP backends (aiohttp,
+# requests) and python-dotenv are imported where they are first used, so
+# importing this module for its parsers is fast and has no side effects.
 
-# Retrieve credentials
-keeco_username = os.getenv('KEECO_USERNAME')
-keeco_password = os.getenv('KEECO_PASSWORD')
+@lru_cache(maxsize=None)
+def selenium_support():
+    """Return (By, WebDriverWait, expected_conditions), importing selenium on first use."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions
+    return By, WebDriverWait, expected_conditions
 
-print("Debug: Checking environment variables:")
-print(f"Debug: .env file path: {os.path.abspath(dotenv_path)}")
-print(f"Debug: KEECO_USERNAME is {'set' if keeco_username else 'not set'}")
-print(f"Debug: KEECO_PASSWORD is {'set' if keeco_password else 'not set'}")
+# Requests the lean browser profile blocks: images (the scraper only reads
+# their src attributes), web fonts, media, and analytics/tracking scripts
+LEAN_BLOCKED_URLS = [
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*", "*/dw/image/*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.mp4*", "*.webm*",
+    "*googletagmanager.com/*", "*google-analytics.com/*", "*doubleclick.net/*", "*googleadservices.com/*",
+    "*connect.facebook.net/*", "*facebook.com/tr*", "*hotjar.com/*", "*clarity.ms/*", "*bat.bing.com/*",
+    "*klaviyo.com/*", "*pinterest.com/*", "*nr-data.net/*", "*newrelic.com/*", "*cquotient.com/*",
+]
 
-if not keeco_username or not keeco_password:
-    print("Error: KEECO_USERNAME and KEECO_PASSWORD environment variables must be set.")
-    sys.exit(1)
+# Browser features a crawl never uses
+LEAN_ARGUMENTS = [
+    '--blink-settings=imagesEnabled=false',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--mute-audio',
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+]
+
+def create_driver(profile="full", headless=False, measure_bytes=False):
+    """Launch a new Chrome instance with the scraper's standard options.
+
+    profile "lean" blocks images, fonts, media and tracking scripts and turns
+    off unused browser features. measure_bytes turns on Chrome's network
+    performance log, which downloaded_bytes() reads.
+    """
+    import undetected_chromedriver as uc
 
-# Initialize WebDriver with undetected-chromedriver
-try:
-    print("Initializing Chrome WebDriver...")
     options = uc.ChromeOptions()
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
-    # Remove headless mode as it can cause issues with undetected-chromedriver
-    # options.add_argument('--headless')
-    
+    if profile == "lean":
+        for argument in LEAN_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    if measure_bytes:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    # Headless mode can cause issues with undetected-chromedriver, so it is opt-in (KEECO_HEADLESS)
     # Use version_main to specify your Chrome version
-    driver = uc.Chrome(
+    new_driver = uc.Chrome(
         options=options,
+        headless=headless,
         version_main=132  # Specify your Chrome version here
     )
-    driver.set_window_size(1920, 1080)  # Set a standard window size
-    print("WebDriver initialized successfully!")
-except Exception as e:
-    print(f"Error initializing WebDriver: {e}")
-    sys.exit(1)
+    new_driver.set_window_size(1920, 1080)  # Set a standard window size
+    if profile == "lean":
+        # Blocked in the network layer, so matching requests are never sent
+        new_driver.execute_cdp_cmd("Network.enable", {})
+        new_driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+    return new_driver
 
-# Function to log in
-def login_to_site():
+def downloaded_bytes(browser):
+    """Bytes the browser received since the last call, from its network performance log."""
+    total = 0
+    for entry in browser.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message["method"] == "Network.loadingFinished":
+            total += message["params"].get("encodedDataLength", 0)
+    return total
+
+class ScraperSession:
+    """
+    Settings, credentials and shared resources of one scraper run.
+
+    Creating a session reads the .env file and the KEECO_* settings and
+    nothing else. Chrome is launched the first time .driver is used, and
+    the crawl state and HTTP fetch backend are opened by start_backends().
+    The crawl functions in this module use the module-level session, which
+    main() creates.
+    """
+
+    def __init__(self, dotenv_path='.env'):
+        from dotenv import load_dotenv
+
+        # Load .env file
+        self.dotenv_path = dotenv_path
+        load_dotenv(dotenv_path)
+
+        # Retrieve credentials
+        self.username = os.getenv('KEECO_USERNAME')
+        self.password = os.getenv('KEECO_PASSWORD')
+
+        # Storefront to crawl; point it at a local copy (benchmarks/fixture_server.py)
+        # to run or profile the scraper without the live site
+        self.base_url = os.getenv('KEECO_BASE_URL', 'https://www.keecohospitality.com').rstrip('/')
+
+        # Number of parallel browser workers (1 keeps the original single-driver crawl)
+        self.max_crawl_workers = int(os.getenv('KEECO_MAX_WORKERS', '8'))
+        self.crawl_workers = min(max(int(os.getenv('KEECO_WORKERS', '1')), 1), self.max_crawl_workers)
+
+        # Products per listing page requested through the start/sz paging parameters
+        self.page_size = int(os.getenv('KEECO_PAGE_SIZE', '24'))
+
+        # "http" fetches product pages with the browser's cookies and only falls back
+        # to Chrome when the response lacks product markup; "browser" always uses Chrome
+        self.fetch_backend = os.getenv('KEECO_FETCH_BACKEND', 'http').lower()
+        self.http_fetcher = None
+
+        # "async" fetches each category's product pages concurrently with asyncio,
+        # paced by an adaptive per-host rate limit instead of fixed sleeps
+        self.crawl_mode = os.getenv('KEECO_CRAWL_MODE', 'sync').lower()
+        self.async_concurrency = int(os.getenv('KEECO_CONCURRENCY', '8'))
+        self.async_rate = float(os.getenv('KEECO_RATE', '4'))
+        self.async_crawler = None
+
+        # Persistent per-URL crawl state for incremental runs (empty path disables it).
+        # Products fetched less than KEECO_STATE_MAX_AGE hours ago are reused as-is.
+        self.state_db_path = os.getenv('KEECO_STATE_DB', 'crawl_state.sqlite3')
+        self.state_max_age = float(os.getenv('KEECO_STATE_MAX_AGE', '0'))
+        self.crawl_state = None
+
+        # Pause between products, to keep the crawl polite to the site
+        self.product_delay = float(os.getenv('KEECO_PRODUCT_DELAY', '1'))
+
+        # Append-only journal of scraped products, replayed by --resume
+        self.checkpoint = None
+
+        # Worker processes that clean extracted products while the crawl goes on
+        # (0 cleans them in the crawl loop), and how many products may wait for them
+        self.clean_workers = int(os.getenv('KEECO_CLEAN_WORKERS', '0'))
+        self.clean_backlog = max(int(os.getenv('KEECO_CLEAN_BACKLOG', '64')), 1)
+
+        # "lean" blocks images, fonts, media and tracking scripts in Chrome; "full"
+        # loads pages as a normal browser would. KEECO_PAGE_BYTES=1 records the
+        # bytes each page downloads, to compare the two.
+        self.browser_profile = os.getenv('KEECO_BROWSER_PROFILE', 'full').lower()
+        self.headless = os.getenv('KEECO_HEADLESS', '0') == '1'
+        self.measure_bytes = os.getenv('KEECO_PAGE_BYTES', '0') == '1'
+
+        self._driver = None
+
+    def check_credentials(self):
+        """Report which credentials are set and exit if either is missing."""
+        print("Debug: Checking environment variables:")
+        print(f"Debug: .env file path: {os.path.abspath(self.dotenv_path)}")
+        print(f"Debug: KEECO_USERNAME is {'set' if self.username else 'not set'}")
+        print(f"Debug: KEECO_PASSWORD is {'set' if self.password else 'not set'}")
+
+        if not self.username or not self.password:
+            print("Error: KEECO_USERNAME and KEECO_PASSWORD environment variables must be set.")
+            sys.exit(1)
+
+    @property
+    def driver(self):
+        """The main Chrome instance, launched on first use."""
+        if self._driver is None:
+            # Initialize WebDriver with undetected-chromedriver
+            try:
+                print("Initializing Chrome WebDriver...")
+                self._driver = create_driver(**self.browser_options)
+                print("WebDriver initialized successfully!")
+            except Exception as e:
+                print(f"Error initializing WebDriver: {e}")
+                sys.exit(1)
+        return self._driver
+
+    @property
+    def browser_options(self):
+        """Keyword arguments for create_driver() from the session's settings."""
+        return {"profile": self.browser_profile, "headless": self.headless, "measure_bytes": self.measure_bytes}
+
+    @property
+    def browser_started(self):
+        return self._driver is not None
+
+    def restart_driver(self):
+        """Quit the main Chrome instance and launch a new one (not yet logged in)."""
+        old_driver, self._driver = self._driver, None
+        if old_driver is not None:
+            old_driver.quit()
+        self._driver = create_driver(**self.browser_options)
+        return self._driver
+
+    def start_backends(self):
+        """Open the crawl state and the configured fetch backend, sharing the browser's cookies."""
+        from keeco_http import AsyncCrawler, HttpFetcher
+
+        if self.state_db_path:
+            self.crawl_state = CrawlState(self.state_db_path, max_age_hours=self.state_max_age)
+        if self.crawl_mode == "async":
+            self.async_crawler = AsyncCrawler(concurrency=self.async_concurrency, rate=self.async_rate)
+            self.async_crawler.load_cookies(self.driver)
+        elif self.fetch_backend == "http":
+            self.http_fetcher = HttpFetcher(pool_size=max(self.crawl_workers, 10))
+            self.http_fetcher.load_cookies(self.driver)
+
+    def close(self):
+        """Close every resource the session opened."""
+        if self.http_fetcher:
+            self.http_fetcher.close()
+        if self.crawl_state:
+            self.crawl_state.close()
+        if self.checkpoint:
+            self.checkpoint.close()
+        try:
+            if self._driver is not None:
+                self._driver.quit()
+        except Exception as e:
+            print(f"Error while closing driver: {e}")
+        self._driver = None
+
+# The session of the current run, created by main()
+session = None
+
+def pause(seconds):
+    """time.sleep, recorded in the run metrics as the "sleep" stage."""
+    with metrics.timer("sleep"):
+        time.sleep(seconds)
+
+# Selectors that must all be present before a page is usable
+PRODUCT_READY_SELECTORS = ("#product-content", ".product-detail")
+LISTING_READY_SELECTORS = ("#search-result-items",)
+
+# How long the DOM must go without mutations to count as settled, and the
+# longest a page that never stops mutating is waited for once it is ready
+DOM_QUIET_MS = 250
+DOM_SETTLE_LIMIT_MS = 2000
+
+# Runs in the page. Calls back with the milliseconds until the selectors were
+# all present and the DOM had settled, or null on timeout. A MutationObserver
+# re-checks the page on every DOM change instead of polling on a timer.
+READY_SCRIPT = """
+const [selectors, quietMs, settleLimitMs, timeoutMs, done] = arguments;
+const start = performance.now();
+let readyAt = null, quietTimer = null, finished = false;
+const observer = new MutationObserver(check);
+const deadline = setTimeout(() => finish(null), timeoutMs);
+function finish(result) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(deadline);
+    clearTimeout(quietTimer);
+    document.removeEventListener("readystatechange", check);
+    done(result);
+}
+function settled() {
+    finish({ready_ms: readyAt - start, settled_ms: performance.now() - start});
+}
+function check() {
+    if (document.readyState === "loading" || !selectors.every(s => document.querySelector(s))) return;
+    if (readyAt === null) readyAt = performance.now();
+    if (performance.now() - readyAt >= settleLimitMs) return settled();
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(settled, quietMs);
+}
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+document.addEventListener("readystatechange", check);
+check();
+"""
+
+def wait_until_ready(browser, selectors, timeout=30):
+    """
+    Wait until every selector matches and the DOM has stopped changing.
+
+    Returns True as soon as the page is usable, or False after timeout
+    seconds. The whole wait is recorded as the "wait" stage, and the part
+    spent waiting for the DOM to settle as "settle".
+    """
+    start = time.perf_counter()
     try:
-        driver.get("https://www.keecohospitality.com/home/FMI")
-        email_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text'][placeholder='email address']"))
+        browser.set_script_timeout(timeout + 5)
+        result = browser.execute_async_script(
+            READY_SCRIPT, list(selectors), DOM_QUIET_MS, DOM_SETTLE_LIMIT_MS, timeout * 1000
         )
-        password_field = driver.find_element(By.CSS_SELECTOR, "input[type='password'][placeholder='password']")
-        email_field.send_keys(keeco_username)
-        password_field.send_keys(keeco_password)
-        sign_in_button = driver.find_element(By.CSS_SELECTOR, "button.sign-in-button")
+    except Exception as e:
+        # The browser could not run the script; wait for the selectors alone
+        print(f"DEBUG: Readiness script failed ({e}), waiting for the selectors instead")
+        result = wait_for_selectors(browser, selectors, timeout - (time.perf_counter() - start))
+    metrics.observe("wait", time.perf_counter() - start)
+    if not result:
+        metrics.increment("wait_timeouts")
+        return False
+    metrics.observe("settle", (result["settled_ms"] - result["ready_ms"]) / 1000)
+    return True
+
+def wait_for_selectors(browser, selectors, timeout):
+    """Poll until every selector matches; returns wait_until_ready's result shape, or None on timeout."""
+    By, WebDriverWait, EC = selenium_support()
+    start = time.perf_counter()
+    try:
+        WebDriverWait(browser, max(timeout, 0), poll_frequency=0.1).until(
+            lambda driver: all(driver.find_elements(By.CSS_SELECTOR, selector) for selector in selectors)
+        )
+    except Exception:
+        return None
+    waited_ms = (time.perf_counter() - start) * 1000
+    return {"ready_ms": waited_ms, "settled_ms": waited_ms}
+
+def record_page_bytes(browser, page_url):
+    """Add the bytes downloaded for the page just loaded to the run metrics (with KEECO_PAGE_BYTES=1)."""
+    if not session.measure_bytes:
+        return
+    try:
+        page_bytes = downloaded_bytes(browser)
+    except Exception as e:
+        print(f"DEBUG: Could not read the browser's network log: {e}")
+        return
+    metrics.increment("browser_pages")
+    metrics.increment("browser_bytes", page_bytes)
+    print(f"DEBUG: {page_bytes / 1024:.0f} KiB downloaded for {page_url}")
+
+# Function to log in
+def login_to_site(browser=None, exit_on_failure=True):
+    """Log in with the given browser (defaults to the session's driver).
+
+    Returns True on success. On failure the browser is closed and the process
+    exits, unless exit_on_failure is False, in which case False is returned.
+    """
+    By, WebDriverWait, EC = selenium_support()
+    browser = browser or session.driver
+    try:
+        with metrics.timer("navigate"):
+            browser.get(f"{session.base_url}/home/FMI")
+        with metrics.timer("wait"):
+            email_field = WebDriverWait(browser, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text'][placeholder='email address']"))
+            )
+        password_field = browser.find_element(By.CSS_SELECTOR, "input[type='password'][placeholder='password']")
+        email_field.send_keys(session.username)
+        password_field.send_keys(session.password)
+        sign_in_button = browser.find_element(By.CSS_SELECTOR, "button.sign-in-button")
         sign_in_button.click()
 
         # Wait for login confirmation
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#header > div.content > div.customer-info"))
-        )
+        with metrics.timer("wait"):
+            WebDriverWait(browser, 30).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#header > div.content > div.customer-info"))
+            )
+        metrics.increment("logins")
         print("Login successful!")
+        return True
     except Exception as e:
         print(f"Error during login: {e}")
-        driver.quit()
-        sys.exit(1)
+        browser.quit()
+        if exit_on_failure:
+            sys.exit(1)
+        return False
 
 # Function to scrape product details from the product page
-def scrape_product_page(product_url):
-    driver.get(product_url)
+def scrape_product_page(product_url, browser=None):
+    """Load a product page in the browser and parse its rendered HTML in one pass."""
+    browser = browser or session.driver
+    with metrics.timer("navigate"):
+        browser.get(product_url)
     try:
         # Wait for the product page to load
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#product-content"))
-        )
+        if not wait_until_ready(browser, PRODUCT_READY_SELECTORS, timeout=15):
+            raise Exception("product page did not load")
+        record_page_bytes(browser, product_url)
 
-        # Initialize the product data dictionary
-        product_data = {"url": product_url}
+        # One page_source round trip instead of one per element and table cell
+        with metrics.timer("extract"):
+            product_data = scrape_product_html(product_url, browser.page_source)
+        if product_data is None:
+            raise Exception("#product-content missing from page source")
+        return product_data
 
-        # Extract product name
-        try:
-            parent_product_name = driver.find_element(By.CSS_SELECTOR, "#product-content > h1 > div.product-name").text.strip()
-            product_data["parent_name"] = clean_text(parent_product_name)
-        except Exception:
-            product_data["parent_name"] = ""
+    except Exception as e:
+        print(f"Error scraping product page: {e}")
+        return {"url": product_url, "error": str(e)}
 
-        # Extract long description
-        try:
-            long_description = driver.find_element(By.CSS_SELECTOR, "#product-content > div.product-long-description").text.strip()
-            product_data["long_description"] = clean_text(long_description)
-        except Exception:
-            product_data["long_description"] = ""
+# Block-level tags that WebDriver's .text separates with line breaks
+BLOCK_TAGS = {"div", "p", "li", "ul", "ol", "tr", "table", "h1", "h2", "h3", "h4", "h5", "h6", "section"}
 
-        # Extract images
-        try:
-            image_container = driver.find_element(By.CSS_SELECTOR, "#product-content > div.product-image-container.mobile-show")
-            images = image_container.find_elements(By.TAG_NAME, "img")
-            product_data["images"] = [img.get_attribute("src") for img in images]
-        except Exception:
-            product_data["images"] = []
+def html_text(element):
+    """Approximate WebDriver's .text for an lxml element."""
+    parts = []
 
-        # Extract table data with enhanced cleaning
-        try:
-            table_container = driver.find_element(By.CSS_SELECTOR, ".order-table")
-            table_headers = table_container.find_elements(By.TAG_NAME, "th")
-            header_mapping = [clean_text(header.text.strip()) for header in table_headers]
-            
-            table_rows = table_container.find_elements(By.TAG_NAME, "tr")
-            table_data = []
-            
-            for row in table_rows[1:]:
-                cols = row.find_elements(By.TAG_NAME, "td")
-                if len(cols) == len(header_mapping):
-                    variant_data = {
-                        "item": clean_text(cols[header_mapping.index("Item")].text.strip()) if "Item" in header_mapping else "",
-                        "type_size": clean_type_size(
-                            product_data.get("parent_name", ""),
-                            cols[header_mapping.index("Product Name")].text.strip()
-                        ) if "Product Name" in header_mapping else "",
-                        "price_per_unit": cols[header_mapping.index("Price/Unit")].text.strip() if "Price/Unit" in header_mapping else "",
-                        "units_per_case": standardize_case_info(cols[header_mapping.index("Unit/Case")].text.strip()) if "Unit/Case" in header_mapping else "",
-                    }
-                    table_data.append(variant_data)
-            
-            product_data["table_data"] = table_data
-        except Exception as e:
-            product_data["table_data"] = []
-            print(f"DEBUG: Failed to extract table data: {e}")
+    def walk(node):
+        if isinstance(node.tag, str) and node.tag not in ("script", "style"):
+            if node.tag == "br" or node.tag in BLOCK_TAGS:
+                parts.append("\n")
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                walk(child)
+                if child.tail:
+                    parts.append(child.tail)
 
-        # Extract and process details with size-specific handling
-        try:
-            detail_section = driver.find_element(By.CSS_SELECTOR, "#detail")
-            keys = detail_section.find_elements(By.CSS_SELECTOR, ".col-1")
-            values = detail_section.find_elements(By.CSS_SELECTOR, ".col-2")
-
-            raw_details = {}
-            for key, value in zip(keys, values):
-                key_text = clean_text(key.text.strip())
-                value_text = clean_text(value.text.strip())
-                raw_details[key_text] = value_text
-            
-            # Parse details by variant and apply enhanced cleaning
-            variant_details = parse_details_by_variant(raw_details)
-            
-            # Update table_data with cleaned and merged details
-            for row in product_data["table_data"]:
-                type_size = row["type_size"]
-                matched_details = None
-                
-                # Find matching variant details
-                for variant, details in variant_details.items():
-                    if type_size.lower() in variant.lower() or variant.lower() in type_size.lower():
-                        matched_details = details
-                        break
-                
-                if not matched_details:
-                    matched_details = raw_details
-                
-                # Clean and merge dimensions and weights
-                dimensions = clean_dimensions(
-                    matched_details.get("Dimensions", ""),
-                    matched_details.get("Shipping Carton", "")
-                )
-                
-                fill_weight = merge_fill_weights(
-                    matched_details.get("Fill Weight", ""),
-                    matched_details.get("Additional Fill Weight", "")
-                )
-                
-                row["details"] = {
-                    "Dimensions": dimensions,
-                    "Fill Weight": fill_weight,
-                    "Care": clean_text(matched_details.get("Care", "")),
-                    "Design": clean_text(matched_details.get("Design", "")),
-                    "Fabric": clean_text(matched_details.get("Fabric", "")),
-                    "Fill Type": clean_text(matched_details.get("Fill Type", "")),
-                    "Origin": clean_text(matched_details.get("Origin", "")),
-                    "Warranties": clean_text(matched_details.get("Warranties", ""))
-                }
-            
-        except Exception as e:
-            print(f"DEBUG: Failed to extract details: {e}")
-            for row in product_data["table_data"]:
-                row["details"] = {}
+    walk(element)
+    return "".join(parts).strip()
 
-        return product_data
+def extract_product_html(product_url, html):
+    """
+    Extract a product page's raw fields, without cleaning them.
 
-    except Exception as e:
-        print(f"Error scraping product page: {e}")
-        return {"url": product_url, "error": str(e)}
+    Used for both driver.page_source and HTML from the HTTP fetch backends;
+    html may also be an already parsed lxml tree. Returns None when the page
+    lacks #product-content (login page, bot check, error page), so callers can
+    fall back to the browser. keeco_cleaning.clean_product turns the record
+    into the product_data dict; splitting the two lets the cleaning run in a
+    worker process while the crawl moves on.
+    """
+    tree = html if isinstance(html, lxml.html.HtmlElement) else lxml.html.fromstring(html)
+    content = tree.cssselect("#product-content")
+    if not content:
+        return None
+
+    def first(selector, root=tree):
+        matches = root.cssselect(selector)
+        return matches[0] if matches else None
+
+    raw = {}
+
+    parent_name = first("#product-content > h1 > div.product-name")
+    raw["parent_name"] = html_text(parent_name) if parent_name is not None else ""
+
+    long_description = first("#product-content > div.product-long-description")
+    raw["long_description"] = html_text(long_description) if long_description is not None else ""
+
+    image_container = first("#product-content > div.product-image-container.mobile-show")
+    if image_container is not None:
+        raw["images"] = [img.get("src") for img in image_container.iter("img")]
+    else:
+        raw["images"] = []
+
+    table_container = first(".order-table")
+    if table_container is not None:
+        raw["table_headers"] = [html_text(header) for header in table_container.iter("th")]
+        raw["table_rows"] = [
+            [html_text(col) for col in row.iter("td")]
+            for row in list(table_container.iter("tr"))[1:]
+        ]
+    else:
+        print("DEBUG: Failed to extract table data: no .order-table in page")
+        raw["table_headers"] = []
+        raw["table_rows"] = []
+
+    detail_section = first("#detail")
+    if detail_section is not None:
+        keys = detail_section.cssselect(".col-1")
+        values = detail_section.cssselect(".col-2")
+        raw["details"] = [[html_text(key), html_text(value)] for key, value in zip(keys, values)]
+    else:
+        print("DEBUG: Failed to extract details: no #detail in page")
+        raw["details"] = None
+
+    return {"url": product_url, "raw": raw}
+
+def scrape_product_html(product_url, html):
+    """Parse a product page's HTML into the cleaned product_data dict (None without #product-content)."""
+    record = extract_product_html(product_url, html)
+    return clean_product(record) if record is not None else None
+
+# lxml raises these for pages it cannot parse (e.g. "Document is empty")
+PARSE_ERRORS = (lxml.etree.LxmlError, ValueError)
+
+def parse_product_page(product_url, html, etag=None, last_modified=None):
+    """
+    Extract the raw product record from product HTML (see extract_product_html),
+    reusing the stored record when crawl state shows the #product-content
+    markup is unchanged since the last run.
+    """
+    with metrics.timer("extract"):
+        return _parse_product_page(product_url, html, etag, last_modified)
+
+def _parse_product_page(product_url, html, etag, last_modified):
+    tree = lxml.html.fromstring(html)
+    content = tree.cssselect("#product-content")
+    if not content:
+        return None
+    crawl_state = session.crawl_state
+    if not crawl_state:
+        return extract_product_html(product_url, tree)
+
+    page_hash = content_hash(lxml.html.tostring(content[0]))
+    entry = crawl_state.get(product_url)
+    if entry and entry["content_hash"] == page_hash:
+        crawl_state.touch(product_url, "unchanged", etag, last_modified)
+        return entry["product"]
+
+    record = extract_product_html(product_url, tree)
+    crawl_state.save(product_url, page_hash, record, etag, last_modified, is_new=entry is None)
+    return record
 
 def refresh_session():
     """Refresh the browser session if needed."""
-    global driver  # Add global declaration
     try:
         # Test if session is still valid
-        driver.current_url
+        session.driver.current_url
         return True
     except Exception:
         print("Session expired, refreshing...")
+        metrics.increment("session_refreshes")
         try:
             # Re-initialize driver
-            driver.quit()
-            options = uc.ChromeOptions()
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            driver = uc.Chrome(
-                options=options,
-                version_main=132
-            )
-            driver.set_window_size(1920, 1080)
+            session.restart_driver()
             
             # Re-login
             login_to_site()
             return True
         except Exception as e:
             print(f"Failed to refresh session: {e}")
+            metrics.increment("session_refresh_failures")
             return False
 
 def get_fresh_elements(driver, selector, timeout=30):
-    """Get fresh elements with retry logic for stale elements."""
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        try:
-            elements = WebDriverWait(driver, 5).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector))
-            )
-            # Verify elements are not stale
-            for element in elements:
-                try:
-                    _ = element.is_displayed()
-                except:
-                    raise Exception("Stale element found")
-            return elements
-        except Exception as e:
-            print(f"Retrying to get fresh elements: {str(e)}")
-            time.sleep(1)
-    raise Exception(f"Could not get fresh elements after {timeout} seconds")
+    """Get the elements matching selector once none of them is stale."""
+    By, WebDriverWait, EC = selenium_support()
+    from selenium.common.exceptions import StaleElementReferenceException
+
+    def fresh_elements(driver):
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        # is_displayed() raises on a stale element, which makes the wait poll again
+        for element in elements:
+            element.is_displayed()
+        return elements or False
+
+    try:
+        with metrics.timer("wait"):
+            return WebDriverWait(
+                driver, timeout, poll_frequency=0.1, ignored_exceptions=(StaleElementReferenceException,)
+            ).until(fresh_elements)
+    except Exception:
+        metrics.increment("wait_timeouts")
+        raise Exception(f"Could not get fresh elements after {timeout} seconds")
+
+# Product links on a category listing page
+PRODUCT_LINK_XPATH = "//div[contains(@class, 'product-tile')]//a[contains(@class, 'name-link')]"
 
 def get_product_links(driver):
     """Get all product links from the current page."""
+    By = selenium_support()[0]
     links = []
     max_attempts = 3
     delay = 2
@@ -255,21 +577,21 @@ def get_product_links(driver):
     for attempt in range(max_attempts):
         try:
             # Wait for product grid
-            WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.ID, "search-result-items"))
-            )
+            if not wait_until_ready(driver, LISTING_READY_SELECTORS):
+                raise Exception("product grid did not load")
             
             # Get all product links directly using XPath
-            elements = driver.find_elements(By.XPATH, "//div[contains(@class, 'product-tile')]//a[contains(@class, 'name-link')]")
-            
-            # Extract href attributes
-            for element in elements:
-                try:
-                    link = element.get_attribute("href")
-                    if link and link not in links:
-                        links.append(link)
-                except:
-                    continue
+            with metrics.timer("extract_links"):
+                elements = driver.find_elements(By.XPATH, PRODUCT_LINK_XPATH)
+                
+                # Extract href attributes
+                for element in elements:
+                    try:
+                        link = element.get_attribute("href")
+                        if link and link not in links:
+                            links.append(link)
+                    except:
+                        continue
             
             if links:
                 return links
@@ -277,7 +599,8 @@ def get_product_links(driver):
         except Exception as e:
             print(f"Attempt {attempt + 1} failed to get product links: {str(e)}")
             if attempt < max_attempts - 1:
-                time.sleep(delay)
+                metrics.increment("retries")
+                pause(delay)
                 delay *= 2
                 continue
             else:
@@ -286,545 +609,531 @@ def get_product_links(driver):
     
     return links
 
-def extract_products_from_category(category_name, category_url):
-    global driver
-    driver.get(category_url)
-    products = []
-    processed_urls = set()  # Keep track of processed URLs
+def checkpoint_product(product_details):
+    """Append a finished product to the checkpoint journal, if one is open."""
+    if session.checkpoint:
+        session.checkpoint.record_product(product_details)
+
+def extract_products_from_category(category_name, category_url, processed_urls=frozenset()):
+    """Collect every product link in the category first, then visit each product once.
+
+    Yields each product as soon as it is scraped. Links in processed_urls
+    (products restored from a checkpoint) are skipped.
+    """
     print(f"Extracting products from {category_name}...")
+    product_links = [link for link in iter_category_links(category_url) if link not in processed_urls]
+    print(f"DEBUG: Found {len(product_links)} products to process in {category_name}.")
     
-    while True:
+    for product_link in product_links:
         try:
-            # Get all product links on current page
-            product_links = get_product_links(driver)
-            print(f"DEBUG: Found {len(product_links)} product links on the page.")
+            print(f"DEBUG: Processing product: {product_link}")
             
-            if not product_links:
-                print("No product links found on page, trying to refresh session...")
-                if not refresh_session():
-                    break
-                continue
+            # Process the product
+            product_details = process_product(product_link)
+            if product_details:
+                product_details["category"] = category_name
+                checkpoint_product(product_details)
+                print(f"Successfully processed product: {product_link}")
             
-            # Process each product link
-            for product_link in product_links:
-                try:
-                    if product_link in processed_urls:
-                        print(f"DEBUG: Already processed: {product_link}")
-                        continue
-                    
-                    processed_urls.add(product_link)
-                    print(f"DEBUG: Processing product: {product_link}")
-                    
-                    # Process the product
-                    product_details = process_product(product_link)
-                    if product_details:
-                        product_details["category"] = category_name
-                        products.append(product_details)
-                        print(f"Successfully processed product: {product_link}")
-                    
-                    # Add a small delay between products
-                    time.sleep(1)
-                    
-                except Exception as e:
-                    print(f"ERROR: Failed to process product: {str(e)}")
-                    if not refresh_session():
-                        break
-                    continue
-            
-            # Check for next page
-            try:
-                next_button = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".pagination .next"))
-                )
-                
-                if "disabled" in next_button.get_attribute("class"):
-                    print("DEBUG: Reached last page in category.")
-                    break
-                
-                print("DEBUG: Clicking next page button...")
-                driver.execute_script("arguments[0].click();", next_button)
-                
-                # Wait for page to load
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"DEBUG: No more pages in this category: {str(e)}")
-                break
+            # Add a small delay between products
+            pause(session.product_delay)
             
         except Exception as e:
-            print(f"Error loading products from category: {str(e)}")
+            print(f"ERROR: Failed to process product: {str(e)}")
+            metrics.increment("products_failed")
             if not refresh_session():
                 break
-    
-    return products
+            continue
+        
+        if product_details:
+            yield product_details
 
-def process_product(product_url, max_retries=3):
-    """Process a single product with retry logic."""
-    global driver
+def extract_products_from_category_async(category_name, category_url, crawler, processed_urls=frozenset()):
+    """Same products as extract_products_from_category, with pages fetched by an AsyncCrawler."""
+    product_links = [link for link in iter_category_links(category_url) if link not in processed_urls]
+    crawl_state = session.crawl_state
+
+    # Reuse recently fetched products and revalidate the rest conditionally
+    cached = {}
+    validators = {}
+    to_fetch = []
+    for product_link in product_links:
+        entry = crawl_state.get(product_link) if crawl_state else None
+        if entry and crawl_state.is_fresh(entry):
+            crawl_state.record_skip()
+            cached[product_link] = entry["product"]
+            continue
+        if entry:
+            cached[product_link] = entry["product"]
+            validators[product_link] = (entry["etag"], entry["last_modified"])
+        to_fetch.append(product_link)
+
+    print(f"Fetching {len(to_fetch)} of {len(product_links)} products from {category_name} "
+          f"(concurrency {crawler.concurrency})...")
+    results = dict(zip(to_fetch, crawler.fetch_all(to_fetch, validators)))
+
+    for product_link in product_links:
+        if product_link not in results:
+            product_details = cached.pop(product_link)
+        else:
+            # Drop each page as soon as it is parsed
+            result = results.pop(product_link)
+            if result and result.not_modified:
+                crawl_state.touch(product_link, "not_modified")
+                product_details = cached.pop(product_link)
+            elif result:
+                try:
+                    product_details = parse_product_page(product_link, result.html, result.etag, result.last_modified)
+                except PARSE_ERRORS as e:
+                    print(f"DEBUG: Async page could not be parsed ({e}): {product_link}")
+                    product_details = None
+            else:
+                product_details = None
+            if not product_details:
+                # Login page, bot check or repeated errors: let the browser try
+                print(f"DEBUG: Async fetch unusable, using the browser: {product_link}")
+                product_details = process_product(product_link)
+                if product_details:
+                    crawler.load_cookies(session.driver)
+        if product_details:
+            product_details["category"] = category_name
+            checkpoint_product(product_details)
+            yield product_details
+
+def process_product(product_url, max_retries=3, worker=None):
+    """Process a single product with retry logic.
+
+    Each attempt loads the product page once and parses the rendered HTML;
+    the browser is never sent back to the listing page. If a BrowserWorker is
+    given, its own driver is used and a dead session is recovered with
+    worker.refresh(), leaving every other worker untouched.
+    """
+    crawl_state = session.crawl_state
+    http_fetcher = session.http_fetcher
+    entry = crawl_state.get(product_url) if crawl_state else None
+    if entry and crawl_state.is_fresh(entry):
+        crawl_state.record_skip()
+        metrics.increment("products_reused")
+        return entry["product"]
+
+    if http_fetcher and http_fetcher.enabled:
+        if entry:
+            result = http_fetcher.fetch(product_url, entry["etag"], entry["last_modified"])
+        else:
+            result = http_fetcher.fetch(product_url)
+        if result and result.not_modified:
+            http_fetcher.record_hit()
+            crawl_state.touch(product_url, "not_modified")
+            return entry["product"]
+        product_details = None
+        if result:
+            try:
+                product_details = parse_product_page(product_url, result.html, result.etag, result.last_modified)
+            except PARSE_ERRORS as e:
+                print(f"DEBUG: HTTP response could not be parsed ({e}): {product_url}")
+        if product_details:
+            http_fetcher.record_hit()
+            return product_details
+        http_fetcher.record_miss()
+        metrics.increment("http_fallbacks")
+        print(f"DEBUG: HTTP response lacked product markup, using the browser: {product_url}")
+
+    browser = worker.driver if worker else session.driver
     retry_delay = 2
-    original_url = driver.current_url
     
     for attempt in range(max_retries):
         try:
             # Navigate to product
-            driver.get(product_url)
+            with metrics.timer("navigate"):
+                browser.get(product_url)
             
-            # Wait for product content with multiple conditions
-            try:
-                WebDriverWait(driver, 30).until(
-                    EC.presence_of_element_located((By.ID, "product-content"))
-                )
-                WebDriverWait(driver, 30).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "product-detail"))
-                )
-            except Exception as e:
-                print(f"Error waiting for product content: {e}")
-                driver.get(original_url)
+            # Wait until the product content is present and has finished rendering
+            if not wait_until_ready(browser, PRODUCT_READY_SELECTORS):
+                print(f"Error waiting for product content: {product_url}")
                 if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
+                    metrics.increment("retries")
+                    pause(retry_delay)
                     retry_delay *= 2
                     continue
+                metrics.increment("products_failed")
                 return None
+            record_page_bytes(browser, product_url)
             
-            # Add a small delay to ensure content is fully loaded
-            time.sleep(2)
-            
-            # Scrape product details
-            product_details = scrape_product_page(product_url)
+            # Scrape product details from the page that is already loaded
+            product_details = parse_product_page(product_url, browser.page_source)
+            if product_details is None:
+                product_details = {"url": product_url, "error": "#product-content missing from page source"}
             
-            # Return to previous page
-            driver.get(original_url)
-            time.sleep(1)
+            # The browser may have been handed fresh session cookies
+            if http_fetcher and http_fetcher.enabled:
+                http_fetcher.load_cookies(browser)
             
             return product_details
             
         except Exception as e:
             print(f"Attempt {attempt + 1} failed for {product_url}: {str(e)}")
             try:
-                driver.get(original_url)
+                browser.current_url
             except:
-                if not refresh_session():
+                recovered = worker.refresh() if worker else refresh_session()
+                if not recovered:
+                    metrics.increment("products_failed")
                     return None
+                browser = worker.driver if worker else session.driver
             
             if attempt < max_retries - 1:
                 print(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
+                metrics.increment("retries")
+                pause(retry_delay)
                 retry_delay *= 2
             else:
                 print(f"Failed to process product after {max_retries} attempts")
+                metrics.increment("products_failed")
                 return None
     
     return None
 
-def clean_text(text):
-    """Clean up text by fixing encoding issues and normalizing."""
-    if not isinstance(text, str):
-        return ""  # Return empty string for non-string inputs
-    text = fix_text(text)  # Fix text encoding issues
-    text = unicodedata.normalize("NFKC", text)  # Normalize Unicode
-    text = text.replace("\u00a0", " ")  # Replace non-breaking spaces
-    text = re.sub(r"[®™©]", "", text)  # Remove trademark and registered symbols
-    text = text.replace("â€", "-")  # Replace specific encoding issue with dash
-    text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-    return text.strip()
-
-def extract_dimensions(text):
-    """Extract standardized dimensions from text with size context."""
-    if not isinstance(text, str):
-        return ""
-    
-    def standardize_measurement(dimension):
-        # Convert fraction strings to decimal
-        fraction_pattern = r'(\d+)\s*(?:-|and)?\s*(\d+)/(\d+)'
-        fraction_match = re.search(fraction_pattern, dimension)
-        if fraction_match:
-            whole = int(fraction_match.group(1))
-            num = int(fraction_match.group(2))
-            denom = int(fraction_match.group(3))
-            decimal = whole + (num / denom)
-            dimension = str(decimal)
-        
-        # Clean up the number and convert to float for standardization
+class BrowserWorker:
+    """An independently logged-in Chrome session used by CrawlPool."""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.driver = None
+
+    def start(self):
+        """Launch the browser and log in. Returns True on success."""
         try:
-            num = float(re.sub(r'[^\d.]', '', dimension))
-            return '{:.2f}'.format(num)
-        except ValueError:
-            return dimension
-    
-    def process_dimension_group(dim_text):
-        # Common dimension patterns with optional size prefixes
-        patterns = [
-            # Standard dimensions with optional quotes/inches
-            r'(\d+(?:\s*-?\s*\d+/\d+)?|\d+(?:\.\d+)?)\s*(?:"|in(?:ch(?:es)?)?|\'|feet)?\s*[xX]\s*'
-            r'(\d+(?:\s*-?\s*\d+/\d+)?|\d+(?:\.\d+)?)\s*(?:"|in(?:ch(?:es)?)?|\'|feet)?\s*'
-            r'(?:[xX]\s*(\d+(?:\s*-?\s*\d+/\d+)?|\d+(?:\.\d+)?)\s*(?:"|in(?:ch(?:es)?)?|\'|feet)?)?',
-            
-            # Dimensions with explicit labels
-            r'(?:L|Length|W|Width|H|Height)\s*[=:]\s*'
-            r'(\d+(?:\s*-?\s*\d+/\d+)?|\d+(?:\.\d+)?)\s*(?:"|in(?:ch(?:es)?)?|\'|feet)?'
+            self.driver = create_driver(**session.browser_options)
+        except Exception as e:
+            print(f"Worker {self.worker_id}: failed to start browser: {e}")
+            return False
+        if login_to_site(self.driver, exit_on_failure=False):
+            return True
+        # login_to_site has already quit the browser
+        self.driver = None
+        return False
+
+    def refresh(self):
+        """Replace this worker's browser with a fresh, logged-in one."""
+        print(f"Worker {self.worker_id}: session expired, refreshing...")
+        metrics.increment("session_refreshes")
+        self.quit()
+        return self.start()
+
+    def quit(self):
+        try:
+            if self.driver:
+                self.driver.quit()
+        except Exception as e:
+            print(f"Worker {self.worker_id}: error while closing driver: {e}")
+        self.driver = None
+
+class CrawlPool:
+    """
+    A pool of BrowserWorkers pulling product URLs from a shared queue.
+
+    submit() returns a Future per product, so callers can hand results back
+    in the same order the sequential crawl would produce.
+    """
+
+    def __init__(self, size):
+        self.tasks = queue.Queue()
+        self.workers = [BrowserWorker(i + 1) for i in range(size)]
+
+        # Chrome startup and login are slow, so bring the workers up concurrently
+        starters = [threading.Thread(target=worker.start) for worker in self.workers]
+        for thread in starters:
+            thread.start()
+        for thread in starters:
+            thread.join()
+        self.workers = [worker for worker in self.workers if worker.driver]
+        if not self.workers:
+            raise RuntimeError("No crawl workers could be started")
+        print(f"Started {len(self.workers)} crawl workers")
+
+        self.threads = [
+            threading.Thread(target=self._run, args=(worker,), daemon=True)
+            for worker in self.workers
         ]
-        
-        for pattern in patterns:
-            matches = list(re.finditer(pattern, dim_text, re.IGNORECASE))
-            if matches:
-                dimensions = []
-                for match in matches:
-                    # Get all capturing groups that contain numbers
-                    dims = [g for g in match.groups() if g and re.search(r'\d', g)]
-                    if dims:
-                        # Standardize each measurement
-                        standardized_dims = [standardize_measurement(d) for d in dims]
-                        dimensions.append(' x '.join([f'{d}"' for d in standardized_dims]))
-                return '; '.join(dimensions)
-        return ""
-    
-    # Split text into size-specific sections
-    size_sections = re.split(r'(?:\b(?:Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)\b)[:\s-]+', text)
-    
-    # Process each section
-    dimensions = []
-    current_size = ""
-    
-    for i, section in enumerate(size_sections):
-        if i == 0 and not re.search(r'\b(?:Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)\b', text):
-            # This is the only section and has no size prefix
-            processed = process_dimension_group(section)
-            if processed:
-                dimensions.append(processed)
-        else:
-            # Look for size prefix before this section
-            size_match = re.search(r'\b(Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)\b', 
-                                 text[:text.find(section)], 
-                                 re.IGNORECASE)
-            if size_match:
-                current_size = size_match.group(1)
-                processed = process_dimension_group(section)
-                if processed:
-                    dimensions.append(f"{current_size}: {processed}")
-    
-    return '; '.join(filter(None, dimensions))
+        for thread in self.threads:
+            thread.start()
 
-def clean_dimensions(dimensions_data, shipping_data=""):
-    """Clean and merge dimension data from different sources."""
-    if not dimensions_data and not shipping_data:
-        return ""
-        
-    all_dimensions = []
-    
-    # Helper function to process dimension text
-    def process_dim_text(text, prefix=""):
-        if not isinstance(text, str):
-            return []
-        
-        # Split by common separators
-        parts = re.split(r'[;,\n]|\s+(?=[A-Za-z]+:)', text)
-        processed_dims = []
-        
-        for part in parts:
-            # Look for size prefixes
-            size_match = re.match(r'(?:Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)[:\s-]+(.+)', part, re.IGNORECASE)
-            dims = size_match.group(1) if size_match else part
-            
-            # Extract dimensions
-            dim_matches = re.findall(r'(\d+(?:\.\d+)?)\s*(?:"|inches?|\'|[xX])+\s*(\d+(?:\.\d+)?)\s*(?:"|inches?|\')?(?:\s*[xX]\s*(\d+(?:\.\d+)?)\s*(?:"|inches?|\')?)?', dims)
-            
-            for match in dim_matches:
-                # Filter out zero dimensions and standardize
-                valid_dims = ['{:.2f}'.format(float(d)) for d in match if d and float(d) > 0]
-                if valid_dims:
-                    dim_str = ' x '.join(f'{d}"' for d in valid_dims)
-                    if size_match:
-                        dim_str = f"{size_match.group(0).strip()}: {dim_str}"
-                    if prefix:
-                        dim_str = f"{prefix}: {dim_str}"
-                    processed_dims.append(dim_str)
-                    
-        return processed_dims
-
-    # Process product dimensions
-    if dimensions_data:
-        all_dimensions.extend(process_dim_text(dimensions_data, "Product"))
-        
-    # Process shipping dimensions
-    if shipping_data:
-        ship_dims = process_dim_text(shipping_data, "Shipping")
-        # Only add shipping dimensions if they're different from product dimensions
-        for dim in ship_dims:
-            if dim not in all_dimensions:
-                all_dimensions.append(dim)
-    
-    return '; '.join(filter(None, all_dimensions))
+    def _run(self, worker):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                self.tasks.task_done()
+                return
+            future, product_url, category_name = task
+            try:
+                print(f"DEBUG: Worker {worker.worker_id} processing product: {product_url}")
+                product_details = process_product(product_url, worker=worker)
+                if product_details:
+                    product_details["category"] = category_name
+                    checkpoint_product(product_details)
+                future.set_result(product_details)
+                # Add a small delay between products
+                pause(session.product_delay)
+            except Exception as e:
+                print(f"ERROR: Worker {worker.worker_id} failed to process product: {str(e)}")
+                metrics.increment("products_failed")
+                future.set_result(None)
+            finally:
+                self.tasks.task_done()
 
-def merge_fill_weights(product_fill_weight, shipping_fill_weight):
-    """Merge and standardize fill weights from multiple sources."""
-    weights = []
-    
-    for weight_text in [product_fill_weight, shipping_fill_weight]:
-        if not isinstance(weight_text, str):
+    def submit(self, product_url, category_name):
+        """Queue a product and return a Future for its product_data (None on failure)."""
+        future = Future()
+        self.tasks.put((future, product_url, category_name))
+        return future
+
+    def close(self):
+        for _ in self.threads:
+            self.tasks.put(None)
+        for thread in self.threads:
+            thread.join()
+        for worker in self.workers:
+            worker.quit()
+
+def category_page_url(category_url, page, page_size=None):
+    """URL of a listing page (0-based) using the storefront's start/sz paging parameters.
+
+    page_size defaults to the session's KEECO_PAGE_SIZE.
+    """
+    page_size = page_size or session.page_size
+    parts = urlsplit(category_url)
+    query = dict(parse_qsl(parts.query))
+    query.update(start=str(page * page_size), sz=str(page_size))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def has_next_page(browser):
+    """Whether the loaded listing page shows an enabled .pagination .next link."""
+    By = selenium_support()[0]
+    next_buttons = browser.find_elements(By.CSS_SELECTOR, ".pagination .next")
+    return bool(next_buttons) and "disabled" not in (next_buttons[0].get_attribute("class") or "")
+
+def iter_category_links(category_url):
+    """
+    Walk a category's listing pages by page-number URL with the session's driver,
+    yielding each product link once. Each listing page is loaded exactly once.
+    """
+    seen = set()
+    page = 0
+
+    while True:
+        page_url = category_page_url(category_url, page)
+        with metrics.timer("navigate"):
+            session.driver.get(page_url)
+        product_links = get_product_links(session.driver)
+        if not product_links:
+            print("No product links found on page, trying to refresh session...")
+            if not refresh_session():
+                return
+            with metrics.timer("navigate"):
+                session.driver.get(page_url)
+            product_links = get_product_links(session.driver)
+
+        new_links = [link for link in product_links if link not in seen]
+        metrics.increment("listing_pages")
+        record_page_bytes(session.driver, page_url)
+        print(f"DEBUG: Found {len(new_links)} new product links on page {page + 1}.")
+        if not new_links:
+            return
+        for product_link in new_links:
+            seen.add(product_link)
+            yield product_link
+
+        if not has_next_page(session.driver):
+            print("DEBUG: Reached last page in category.")
+            return
+        page += 1
+
+def extract_products_from_category_parallel(category_name, category_url, pool, processed_urls=frozenset()):
+    """Same products, in the same order, as extract_products_from_category, fetched by a CrawlPool."""
+    print(f"Extracting products from {category_name} with {len(pool.workers)} workers...")
+    pending = deque()
+
+    # Workers start on the first links while the listing is still being paged;
+    # finished products are yielded in listing order as soon as they are ready
+    for product_link in iter_category_links(category_url):
+        if product_link in processed_urls:
             continue
-            
-        # Split by size indicators
-        parts = re.split(r'(?:Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)[:\s-]+', weight_text)
-        
-        for part in parts:
-            # Extract weights with units
-            matches = re.finditer(r'(\d+(?:\.\d+)?)\s*(?:oz\.?|ounces?|lbs?\.?|pounds?)', part, re.IGNORECASE)
-            
-            for match in matches:
-                weight = match.group(1)
-                unit = match.group(0)[len(weight):].strip().lower()
-                
-                # Convert to ounces if in pounds
-                if any(u in unit for u in ['lb', 'pound']):
-                    weight = str(float(weight) * 16)
-                
-                # Standardize format
-                weight = '{:.2f}'.format(float(weight))
-                weights.append(f"{weight} oz")
-    
-    # Remove duplicates and sort
-    return '; '.join(sorted(set(weights)))
+        pending.append(pool.submit(product_link, category_name))
+        while pending and pending[0].done():
+            product_details = pending.popleft().result()
+            if product_details:
+                yield product_details
 
-def clean_fill_weight(weight_text):
-    """Standardize fill weight format."""
-    if not isinstance(weight_text, str):
-        return ""
-    
-    weights = []
-    # Split by common separators
-    parts = re.split(r'[;,\n]|\s+(?=[A-Za-z]+:)', weight_text)
-    
-    for part in parts:
-        # Extract size-specific weights
-        size_match = re.match(r'(Standard|Queen|King|Twin|Full|Cal[ifornia]*\s*King)[:\s-]+(.+)', part, re.IGNORECASE)
-        if size_match:
-            size, weight_part = size_match.groups()
-        else:
-            weight_part = part
-            
-        # Extract weight and unit
-        weight_matches = re.finditer(r'(\d+(?:\.\d+)?)\s*(?:oz\.?|ounces?|lbs?\.?|pounds?)', weight_part, re.IGNORECASE)
-        for match in weight_matches:
-            weight = match.group(1)
-            unit_text = match.group(0)[len(weight):].strip().lower()
-            
-            # Convert to ounces if in pounds
-            if 'lb' in unit_text or 'pound' in unit_text:
-                weight = str(float(weight) * 16)
-            
-            # Round to 2 decimal places and remove trailing zeros
-            weight = str(float('{:.2f}'.format(float(weight))))
-            weights.append(f"{weight} oz")
-    
-    return "; ".join(weights)
+    while pending:
+        product_details = pending.popleft().result()
+        if product_details:
+            yield product_details
 
-def clean_type_size(parent_name, type_size):
-    """Clean and standardize type_size."""
-    if not isinstance(type_size, str):
-        return ""
-    
-    # Remove parent name and special characters
-    type_size = re.sub(r'[®™©]', '', type_size)
-    if parent_name:
-        type_size = re.sub(re.escape(parent_name), '', type_size, flags=re.IGNORECASE)
-    
-    # Standardize size formats
-    size_patterns = {
-        r'\b(?:std|standard)\b': 'Standard',
-        r'\b(?:kg|king)\b': 'King',
-        r'\bcal(?:ifornia)?\s*k(?:ing)?\b': 'California King',
-        r'\b(?:qn|queen)\b': 'Queen',
-        r'\bfull\b': 'Full',
-        r'\btwin\s*xl\b': 'Twin XL',
-        r'\btwin\b': 'Twin',
-        r'\bjumbo\b': 'Jumbo',
-        r'\beuro\b': 'Euro'
+CSV_HEADERS = [
+    "Category",
+    "Parent Product Name",
+    "Description",
+    "Images",
+    "Product URL",
+    "SKU",
+    "type_size",
+    "price_per_unit",
+    "units_per_case",
+    "Care",
+    "Design",
+    "Dimensions",
+    "Fabric",
+    "Fill Type",
+    "Fill Weight",
+    "Origin",
+    "Warranties"
+]
+
+# Detail columns of the CSV that are loaded into the specs JSONB column
+SPEC_FIELDS = ["Care", "Design", "Dimensions", "Fabric", "Fill Type", "Fill Weight", "Origin", "Warranties"]
+
+def product_rows(product):
+    """
+    Yield the CSV rows for one product, one per variant.
+
+    Names, descriptions, SKUs, type sizes, case counts and details were
+    already cleaned by clean_product, so only the fields it leaves raw are
+    cleaned here.
+    """
+    base_row = {
+        "Category": clean_text(product.get("category", "")),
+        "Parent Product Name": product.get("parent_name", ""),
+        "Description": product.get("long_description", ""),
+        "Images": "; ".join(clean_image_urls(product.get("images", []))),
+        "Product URL": clean_text(product.get("url", "")),
     }
-    
-    # Clean up the text
-    cleaned = type_size.lower()
-    cleaned = re.sub(r'^.*?(?:pillow|insert|cover|protector|pack|size)\s*[-:,]?\s*', '', cleaned)
-    cleaned = re.sub(r'(?:by|from)\s+.*$', '', cleaned)
-    cleaned = re.sub(r'\s+', ' ', cleaned)
-    cleaned = cleaned.strip()
-    
-    # Apply standardization
-    result = cleaned
-    for pattern, replacement in size_patterns.items():
-        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
-    
-    # Extract density if present
-    density_match = re.search(r'(soft|medium|firm)\s*(?:density|support)?', result, re.IGNORECASE)
-    density = density_match.group(1).title() if density_match else ""
-    
-    # Clean up size
-    size_match = re.search(r'\b(Standard|Queen|King|Twin XL|Twin|Full|California King|Jumbo|Euro)\b', result)
-    size = size_match.group(1) if size_match else ""
-    
-    # Combine size and density
-    if size and density:
-        return f"{size} - {density}"
-    return size if size else cleaned
-
-def clean_shipping_info(dimensions, weight):
-    """Clean and standardize shipping information."""
-    if not isinstance(dimensions, str) or not isinstance(weight, str):
-        return "", ""
-    
-    # Process dimensions
-    dims = extract_dimensions(dimensions)
-    
-    # Process weight
-    weights = []
-    matches = re.finditer(r'(\d+(?:\.\d+)?)\s*(?:lbs?\.?|pounds?)', weight, re.IGNORECASE)
-    
-    for match in matches:
-        weight_val = match.group(1)
-        # Standardize to 2 decimal places
-        weight_val = '{:.2f}'.format(float(weight_val))
-        weights.append(f"{weight_val} lbs")
-    
-    return dims, "; ".join(sorted(set(weights)))
 
-def clean_image_urls(images):
-    """Clean up image URLs by removing anything after .jpg."""
-    cleaned_images = []
-    for img_url in images:
-        match = re.match(r"(.*?\.jpg)", img_url)  # Properly close the regex pattern
-        if match:
-            cleaned_images.append(match.group(1))
-    return cleaned_images
+    if "table_data" not in product:
+        yield base_row
+        return
 
-def save_to_csv(products, filename="products_with_details.csv"):
-    """Save products to CSV with standardized data."""
-    headers = [
-        "Category",
-        "Parent Product Name",
-        "Description",
-        "Images",
-        "Product URL",
-        "SKU",
-        "type_size",
-        "price_per_unit",
-        "units_per_case",
-        "Care",
-        "Design",
-        "Dimensions",
-        "Fabric",
-        "Fill Type",
-        "Fill Weight",
-        "Origin",
-        "Warranties"
-    ]
-
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
+    for variant in product["table_data"]:
+        row = base_row.copy()
+        details = variant.get("details", {})
+        row.update({
+            "SKU": variant.get("item", ""),
+            "type_size": variant.get("type_size", ""),
+            "price_per_unit": NON_NUMERIC.sub('', variant.get("price_per_unit", "")),
+            "units_per_case": variant.get("units_per_case", ""),
+            "Care": details.get("Care", ""),
+            "Design": details.get("Design", ""),
+            "Dimensions": details.get("Dimensions", ""),
+            "Fabric": details.get("Fabric", ""),
+            "Fill Type": details.get("Fill Type", ""),
+            "Fill Weight": details.get("Fill Weight", ""),
+            "Origin": details.get("Origin", ""),
+            "Warranties": details.get("Warranties", "")
+        })
+        yield row
 
+class StreamingCsvWriter:
+    """Write product rows to a CSV file as products arrive, through one open handle."""
+
+    def __init__(self, filename="products_with_details.csv"):
+        self.filename = filename
+        self.file = open(filename, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=CSV_HEADERS)
+        self.writer.writeheader()
+        self.products_written = 0
+        self.rows_written = 0
+
+    def write_product(self, product):
+        rows_before = self.rows_written
+        with metrics.timer("csv_write"):
+            for row in product_rows(product):
+                self.writer.writerow(row)
+                self.rows_written += 1
+            # Keep the file usable as a partial result if the run dies
+            self.file.flush()
+        self.products_written += 1
+        metrics.increment("products_written")
+        metrics.increment("csv_rows_written", self.rows_written - rows_before)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def save_to_csv(products, filename="products_with_details.csv"):
+    """Save products (any iterable) to CSV with standardized data."""
+    with StreamingCsvWriter(filename) as writer:
         for product in products:
-            base_row = {
-                "Category": clean_text(product.get("category", "")),
-                "Parent Product Name": clean_text(product.get("parent_name", "")),
-                "Description": clean_text(product.get("long_description", "")),
-                "Images": "; ".join(clean_image_urls(product.get("images", []))),
-                "Product URL": clean_text(product.get("url", "")),
-            }
-
-            if "table_data" in product:
-                for variant in product["table_data"]:
-                    row = base_row.copy()
-                    details = variant.get("details", {})
-                    
-                    # Clean type size
-                    type_size = clean_type_size(
-                        row["Parent Product Name"],
-                        variant.get("type_size", "")
-                    )
-                    
-                    # Merge and standardize dimensions
-                    dimensions = clean_dimensions(
-                        details.get("Dimensions", ""),
-                        details.get("Shipping Carton", "")
-                    )
-                    
-                    # Merge and standardize fill weights
-                    fill_weight = merge_fill_weights(
-                        details.get("Fill Weight", ""),
-                        details.get("Additional Fill Weight", "")
-                    )
-                    
-                    # Clean units per case
-                    units_per_case = standardize_case_info(variant.get("units_per_case", ""))
-                    
-                    row.update({
-                        "SKU": clean_text(variant.get("item", "")),
-                        "type_size": type_size,
-                        "price_per_unit": re.sub(r'[^\d.]', '', variant.get("price_per_unit", "")),
-                        "units_per_case": units_per_case,
-                        "Care": clean_text(details.get("Care", "")),
-                        "Design": clean_text(details.get("Design", "")),
-                        "Dimensions": dimensions,
-                        "Fabric": clean_text(details.get("Fabric", "")),
-                        "Fill Type": clean_text(details.get("Fill Type", "")),
-                        "Fill Weight": fill_weight,
-                        "Origin": clean_text(details.get("Origin", "")),
-                        "Warranties": clean_text(details.get("Warranties", ""))
-                    })
-
-                    writer.writerow(row)
-            else:
-                writer.writerow(base_row)
+            writer.write_product(product)
 
     print(f"Products saved to {filename}")
-    print(f"Total products saved: {len(products)}")
+    print(f"Total products saved: {writer.products_written}")
 
-def insert_into_postgres(table_name, data):
+def get_db_connection():
+    """Open a PostgreSQL connection from the DB_* environment variables."""
+    import psycopg2
+
+    return psycopg2.connect(
+        dbname=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        host=os.getenv('DB_HOST'),
+        port=os.getenv('DB_PORT')
+    )
+
+def db_row(row):
+    """Map one products CSV row onto the columns of manufactured.keeco (see schema.sql)."""
+    return {
+        "category": row["Category"],
+        "parent_name": row["Parent Product Name"],
+        "sku": row["SKU"],
+        "type_size": row["type_size"],
+        "price_per_unit": row["price_per_unit"] or None,
+        "units_per_case": int(row["units_per_case"]) if str(row["units_per_case"]).isdigit() else None,
+        "specs": {field: row[field] for field in SPEC_FIELDS if row.get(field)},
+    }
+
+def bulk_upsert_into_postgres(table_name, data, conflict_column="sku", batch_size=5000):
     """
-    Insert data into a PostgreSQL database table.
+    Bulk-load rows into a PostgreSQL table and upsert them on conflict_column.
+
+    Rows are streamed with COPY FROM STDIN into a temporary staging table, one
+    batch at a time, and each batch is merged into table_name with a single
+    set-based upsert (see keeco_db.upsert_rows). Existing rows are only
+    updated when their content changed. The whole load is one transaction.
 
     Args:
-        table_name (str): The name of the table to insert data into.
-        data (list of dict): The data to insert, where each dict represents a row.
+        table_name (str): Target table, e.g. "manufactured.keeco".
+        data (iterable of dict): Rows to load; every row must have the same keys.
+        conflict_column (str): Unique column used to match existing rows.
+        batch_size (int): Number of rows copied and merged per batch.
 
     Returns:
-        None
+        dict: Counts of "inserted", "updated" and "unchanged" rows.
     """
-    try:
-        # Connect to the database
-        conn = psycopg2.connect(
-            dbname=os.getenv('DB_NAME'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            host=os.getenv('DB_HOST'),
-            port=os.getenv('DB_PORT')
-        )
-        cursor = conn.cursor()
-
-        # Prepare the SQL statement dynamically
-        if data:
-            # Extract column names from the first row
-            columns = data[0].keys()
-            insert_query = sql.SQL(
-                "INSERT INTO {table} ({fields}) VALUES ({placeholders})"
-            ).format(
-                table=sql.Identifier(table_name),
-                fields=sql.SQL(", ").join(map(sql.Identifier, columns)),
-                placeholders=sql.SQL(", ").join(sql.Placeholder() * len(columns))
-            )
+    from keeco_db import upsert_rows
 
-            # Execute the query for each row of data
-            for row in data:
-                cursor.execute(insert_query, list(row.values()))
-
-            # Commit the transaction
+    conn = None
+    try:
+        conn = get_db_connection()
+        with metrics.timer("db_write"):
+            counts = upsert_rows(conn, table_name, data, conflict_column, batch_size)
             conn.commit()
-            print(f"Inserted {len(data)} rows into {table_name}.")
-
+        for outcome, count in counts.items():
+            metrics.increment(f"db_rows_{outcome}", count)
+        print(f"Loaded {table_name}: {counts['inserted']} inserted, "
+              f"{counts['updated']} updated, {counts['unchanged']} unchanged.")
+        return counts
     except Exception as e:
-        print(f"Error inserting data into PostgreSQL: {e}")
+        print(f"Error bulk loading data into PostgreSQL: {e}")
+        if conn:
+            conn.rollback()
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
     finally:
         if conn:
-            cursor.close()
             conn.close()
 
 
@@ -842,170 +1151,193 @@ def format_details(details):
     """Format the details dictionary into a string for CSV."""
     return "; ".join([f"{clean_text(key)}: {clean_text(value)}" for key, value in details.items()])
 
-def parse_details_by_variant(details):
+def clean_products(records, pool=None, max_pending=64):
     """
-    Parse details section to map information to specific variants.
-    Returns a dictionary mapping variant sizes to their specific details.
+    Yield clean_product() of each raw product record, in crawl order.
+
+    With a process pool, each record is handed to the pool as soon as the
+    crawl produces it and the crawl carries on with the next page. Finished
+    products are yielded in submission order; once max_pending products are
+    waiting, the crawl blocks on the oldest one, so memory stays bounded.
     """
-    variant_details = {}
-    
-    # Fields that should be variant-specific
-    variant_specific_fields = {
-        'Dimensions': True,
-        'Fill Weight': True,
-        'Shipping Carton': True,
-        'Shipping Carton Weight': True,
-        'units_per_case': True
-    }
-    
-    # Process each detail field
-    for key, value in details.items():
-        if not isinstance(value, str):
-            continue
-            
-        # Check if this is a variant-specific field
-        if key in variant_specific_fields:
-            # Split on line breaks and common separators
-            parts = re.split(r'[;\n]', value)
-            for part in parts:
-                # Try to extract size/variant and corresponding value
-                size_match = re.match(
-                    r'^(Standard|Queen|King|Twin|Full|Cal(?:ifornia)?\s*King)[:\s-]+(.+)$',
-                    part.strip(),
-                    re.IGNORECASE
-                )
-                if size_match:
-                    variant, detail = size_match.groups()
-                    variant = variant.strip()
-                    detail = detail.strip()
-                    
-                    if variant not in variant_details:
-                        variant_details[variant] = {}
-                    variant_details[variant][key] = detail
-        else:
-            # For non-variant-specific fields, apply to all known variants
-            for variant in set(variant_details.keys()) | {'Standard', 'Queen', 'King', 'Twin', 'Full', 'California King'}:
-                if variant not in variant_details:
-                    variant_details[variant] = {}
-                variant_details[variant][key] = value.strip()
-    
-    return variant_details
+    if pool is None:
+        for record in records:
+            yield record_clean_time(*timed_clean_product(record))
+        return
 
-def standardize_shipping_info(shipping_dims, shipping_weight):
-    """Standardize shipping information format."""
-    standardized_info = []
-    
-    # Process dimensions
-    if shipping_dims:
-        dims = extract_dimensions(shipping_dims)
-        if dims:
-            standardized_info.append(f"Shipping Dimensions: {dims}")
-    
-    # Process weight
-    if shipping_weight:
-        weight_matches = re.finditer(r'(\d+(?:\.\d+)?)\s*(?:lbs?\.?|pounds?)', shipping_weight, re.IGNORECASE)
-        weights = []
-        for match in weight_matches:
-            weight_val = float(match.group(1))
-            weights.append(f"{weight_val:.2f} lbs")
-        if weights:
-            standardized_info.append(f"Shipping Weight: {'; '.join(weights)}")
-    
-    return " | ".join(standardized_info)
+    pending = deque()
+    for record in records:
+        pending.append(pool.submit(timed_clean_product, record))
+        while pending and (pending[0].done() or len(pending) >= max_pending):
+            yield record_clean_time(*pending.popleft().result())
 
-def standardize_case_info(units_per_case):
-    """Standardize case quantity information."""
-    if not units_per_case:
-        return ""
-    
-    # Extract numeric value only
-    case_match = re.search(r'(\d+)', str(units_per_case))
-    if case_match:
-        return case_match.group(1)
-    return ""
+    while pending:
+        yield record_clean_time(*pending.popleft().result())
+
+def timed_clean_product(record):
+    """Return (clean_product(record), seconds taken); runs in clean worker processes."""
+    start = time.perf_counter()
+    product = clean_product(record)
+    return product, time.perf_counter() - start
+
+def record_clean_time(product, seconds):
+    # Worker processes have their own metrics, so cleaning time is recorded here
+    metrics.observe("clean", seconds)
+    return product
+
+def crawl_categories(categories, pool=None):
+    """Yield every product of every category, skipping work recorded in the checkpoint."""
+    for i, category in enumerate(categories, 1):
+        if category["name"] in session.checkpoint.completed_categories:
+            print(f"Skipping category {category['name']}: already completed in checkpoint")
+            continue
+        try:
+            print(f"\n{'='*50}")
+            print(f"Processing category {i} of {len(categories)}: {category['name']}")
+            print(f"{'='*50}\n")
+            
+            processed_urls = session.checkpoint.processed_urls
+            if session.async_crawler:
+                products = extract_products_from_category_async(category["name"], category["url"], session.async_crawler, processed_urls)
+            elif pool:
+                products = extract_products_from_category_parallel(category["name"], category["url"], pool, processed_urls)
+            else:
+                products = extract_products_from_category(category["name"], category["url"], processed_urls)
+            count = 0
+            for product in products:
+                count += 1
+                yield product
+            session.checkpoint.record_category_done(category["name"])
+            print(f"Successfully processed {count} products from {category['name']}")
+            
+        except Exception as category_error:
+            # Every finished product is already in the checkpoint journal
+            print(f"Error processing category {category['name']}: {str(category_error)}")
+            continue
 
 # Main Execution
 def main():
-    all_products = []
+    global session
+    parser = argparse.ArgumentParser(description="Scrape keecohospitality.com product data.")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the checkpoint journal left by an interrupted run")
+    parser.add_argument("--checkpoint", default="crawl_checkpoint.jsonl",
+                        help="path of the checkpoint journal (default: %(default)s)")
+    parser.add_argument("--metrics", default="crawl_metrics.json",
+                        help="where to write the run's stage timings and counters as JSON (default: %(default)s)")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="serve the metrics in Prometheus text format on http://127.0.0.1:PORT/metrics during the run")
+    parser.add_argument("--profile", nargs="?", const="scraper_profile", metavar="PREFIX",
+                        help="profile the run and write PREFIX.collapsed, PREFIX.pstats and PREFIX.alloc.txt "
+                             "(default prefix: %(const)s)")
+    parser.add_argument("--db-table", metavar="TABLE",
+                        help="after the crawl, upsert the CSV rows into TABLE (e.g. manufactured.keeco) "
+                             "using the DB_* settings")
+    args = parser.parse_args()
+    profiler = Profiler(args.profile).start() if args.profile else None
+
+    session = ScraperSession()
+    session.check_credentials()
+    session.checkpoint = CheckpointJournal(args.checkpoint, resume=args.resume)
+    if profiler and session.clean_workers:
+        # Cleaning in worker processes would be invisible to the profiler
+        print("Profiling: cleaning products in this process (KEECO_CLEAN_WORKERS ignored)")
+        session.clean_workers = 0
+    pool = None
+    clean_pool = None
+    csv_writer = None
+    category_counts = {}
+    metrics_server = metrics.serve(args.metrics_port) if args.metrics_port else None
+    if metrics_server:
+        print(f"Serving metrics on http://127.0.0.1:{args.metrics_port}/metrics")
     try:
         # Step 1: Login
         login_to_site()
+        session.start_backends()
 
         # Step 2: Define the top-level categories and their URLs
         categories = [
-            {"name": "Pillows", "url": "https://www.keecohospitality.com/pillows/"},
-            {"name": "Comforters", "url": "https://www.keecohospitality.com/comforters/"},
-            {"name": "Protectors", "url": "https://www.keecohospitality.com/protectors/"},
-            {"name": "Mattress Pads", "url": "https://www.keecohospitality.com/mattress-pads/"},
-            {"name": "Sheet Sets", "url": "https://www.keecohospitality.com/sheet-sets/"},
-            {"name": "Bath", "url": "https://www.keecohospitality.com/bath/"},
+            {"name": "Pillows", "url": f"{session.base_url}/pillows/"},
+            {"name": "Comforters", "url": f"{session.base_url}/comforters/"},
+            {"name": "Protectors", "url": f"{session.base_url}/protectors/"},
+            {"name": "Mattress Pads", "url": f"{session.base_url}/mattress-pads/"},
+            {"name": "Sheet Sets", "url": f"{session.base_url}/sheet-sets/"},
+            {"name": "Bath", "url": f"{session.base_url}/bath/"},
         ]
 
-        # Step 3: Extract products from each category
-        total_products = 0
-        for i, category in enumerate(categories, 1):
-            try:
-                print(f"\n{'='*50}")
-                print(f"Processing category {i} of {len(categories)}: {category['name']}")
-                print(f"{'='*50}\n")
-                
-                products = extract_products_from_category(category["name"], category["url"])
-                all_products.extend(products)
-                total_products += len(products)
-                print(f"Successfully processed {len(products)} products from {category['name']}")
-                
-                # Save incremental backup
-                save_to_csv(all_products, f"products_with_details_{i}_of_{len(categories)}_backup.csv")
-                print(f"Backup saved to products_with_details_{i}_of_{len(categories)}_backup.csv")
-                
-                # Save consolidated data after each category
-                save_to_csv(all_products, "products_with_details.csv")
-                print(f"Updated consolidated data in products_with_details.csv (Total: {len(all_products)} products)")
-                
-            except Exception as category_error:
-                print(f"Error processing category {category['name']}: {str(category_error)}")
-                # Save progress before moving to next category
-                if all_products:
-                    save_to_csv(all_products, f"products_with_details_error_at_{i}_of_{len(categories)}.csv")
-                    print(f"Progress saved to products_with_details_error_at_{i}_of_{len(categories)}.csv")
-                    # Also update the main consolidated file
-                    save_to_csv(all_products, "products_with_details.csv")
-                continue
+        # Step 3: Stream products from each category straight into the CSV.
+        # Products restored from the checkpoint journal are written first.
+        if session.crawl_workers > 1 and not session.async_crawler:
+            pool = CrawlPool(session.crawl_workers)
+        if session.clean_workers > 0:
+            clean_pool = ProcessPoolExecutor(max_workers=session.clean_workers)
+        records = chain(session.checkpoint.replay_products(), crawl_categories(categories, pool))
+        csv_writer = StreamingCsvWriter("products_with_details.csv")
+        for product in clean_products(records, clean_pool, session.clean_backlog):
+            csv_writer.write_product(product)
+            category = product.get("category", "Unknown")
+            category_counts[category] = category_counts.get(category, 0) + 1
 
-        # Step 4: Print final summary
-        if all_products:
+        # Step 4: Optionally load the CSV rows into the database. Products
+        # without variants have no SKU and are not loaded.
+        if args.db_table and csv_writer.rows_written:
+            csv_writer.close()
+            with open(csv_writer.filename, newline="", encoding="utf-8") as f:
+                rows = (db_row(row) for row in csv.DictReader(f) if row["SKU"])
+                bulk_upsert_into_postgres(args.db_table, rows)
+
+        # Step 5: Print final summary
+        if csv_writer.products_written:
             print(f"\n{'='*50}")
             print("Final Summary:")
             print(f"{'='*50}")
-            print(f"Total products processed: {len(all_products)}")
+            print(f"Total products processed: {csv_writer.products_written}")
             print(f"Categories processed: {len(categories)}")
-            print("All data has been saved to products_with_details.csv")
-            
-            # Calculate category-wise breakdown
-            category_counts = {}
-            for product in all_products:
-                category = product.get("category", "Unknown")
-                category_counts[category] = category_counts.get(category, 0) + 1
+            print(f"All data has been saved to products_with_details.csv ({csv_writer.rows_written} rows)")
             
             print("\nCategory-wise breakdown:")
             for category, count in category_counts.items():
                 print(f"{category}: {count} products")
+
+            if session.http_fetcher:
+                print(f"\nHTTP fetches: {session.http_fetcher.hits} served, "
+                      f"{session.http_fetcher.misses} fell back to the browser")
+            if session.async_crawler:
+                print(f"\nAsync fetches: {session.async_crawler.pages_fetched} served, "
+                      f"{session.async_crawler.pages_failed} failed")
+            if session.crawl_state:
+                print(f"Crawl state: {session.crawl_state.summary()}")
+            browser_pages = metrics.counters.get("browser_pages")
+            if browser_pages:
+                browser_bytes = metrics.counters["browser_bytes"]
+                print(f"Browser downloads ({session.browser_profile} profile): {browser_bytes / 2**20:.1f} MiB "
+                      f"over {browser_pages} pages, {browser_bytes / browser_pages / 1024:.0f} KiB per page")
+            print(normalizer.report())
+            print(f"\nStage timings:\n{metrics.report()}")
         else:
             print("\nNo products were processed successfully.")
 
     except Exception as e:
         print(f"An error occurred in main execution: {e}")
-        if all_products:
-            save_to_csv(all_products, "products_with_details_error_recovery.csv")
-            print("Partial results saved to products_with_details_error_recovery.csv")
-            # Also update the main consolidated file
-            save_to_csv(all_products, "products_with_details.csv")
-        driver.save_screenshot("error_screenshot.png")
+        if csv_writer and csv_writer.products_written:
+            print(f"Partial results ({csv_writer.products_written} products) are in products_with_details.csv; "
+                  f"rerun with --resume to continue")
+        if session.browser_started:
+            session.driver.save_screenshot("error_screenshot.png")
     finally:
-        try:
-            driver.quit()
-        except Exception as e:
-            print(f"Error while closing driver: {e}")
+        if csv_writer:
+            csv_writer.close()
+        if pool:
+            pool.close()
+        if clean_pool:
+            clean_pool.shutdown(cancel_futures=True)
+        session.close()
+        if metrics_server:
+            metrics_server.shutdown()
+        metrics.write_json(args.metrics, clean_text=normalizer.stats())
+        print(f"Metrics written to {args.metrics}")
+        if profiler:
+            profiler.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
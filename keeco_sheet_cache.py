@@ -0,0 +1,119 @@
+"""
+Local Parquet cache of parsed price list sheets for keeco_datasheet.
+
+Parsing a large .xlsx is the slowest part of a datasheet load. Each parsed
+sheet is stored as a Parquet file named after the SHA-256 of the workbook's
+bytes and the sheet name, so a later run against an unchanged workbook reads
+the columns back (memory-mapped) instead of parsing the XML again, and any
+edit to the workbook misses the cache. The raw sheet is cached rather than
+the cleaned one, so changes to the cleaning and column mapping take effect
+without invalidating it.
+
+Parquet columns hold a single type, while sheet columns often mix text and
+numbers ("16", 14.5, "n/a"). Such columns are stored as JSON text and listed
+in the file's metadata, and decoded back to the original values on read.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Bump when the stored layout changes, so older cache files are not read
+FORMAT_VERSION = 1
+
+JSON_COLUMNS_KEY = b"keeco_json_columns"
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def encode_sheet(df):
+    """Arrow table for a parsed sheet, with mixed-type columns stored as JSON text."""
+    json_columns = [
+        column for column in df.columns
+        if df[column].dtype == object and pd.api.types.infer_dtype(df[column]) != "string"
+    ]
+    if json_columns:
+        df = df.copy()
+        for column in json_columns:
+            # NaN round-trips through json as NaN; datetimes raise TypeError
+            df[column] = [json.dumps(value) for value in df[column]]
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[JSON_COLUMNS_KEY] = json.dumps(json_columns).encode("utf-8")
+    return table.replace_schema_metadata(metadata)
+
+
+def decode_sheet(table):
+    """DataFrame for an Arrow table written by encode_sheet."""
+    json_columns = set(json.loads(table.schema.metadata.get(JSON_COLUMNS_KEY, b"[]")))
+    df = table.to_pandas()
+    for column in df.columns:
+        if column in json_columns:
+            df[column] = pd.Series([json.loads(value) for value in df[column]], index=df.index, dtype=object)
+        elif df[column].dtype == object:
+            # Arrow has no NaN for strings; pd.read_excel marks empty text cells with NaN
+            df[column] = df[column].where(df[column].notna(), np.nan)
+    return df
+
+
+class SheetCache:
+    """Directory of parsed sheets keyed by workbook content and sheet name."""
+
+    def __init__(self, directory=".keeco_cache"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, workbook, sheet):
+        """Cache key of a sheet in the workbook's current contents."""
+        source = f"{FORMAT_VERSION}\0{file_hash(workbook)}\0{sheet}"
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".parquet")
+
+    def read(self, key):
+        """Return the cached sheet for key as a DataFrame, or None."""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        return decode_sheet(pq.read_table(path, memory_map=True))
+
+    def iter_chunks(self, key, chunk_rows):
+        """Return an iterator of DataFrames of at most chunk_rows cached rows, or None."""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        parquet = pq.ParquetFile(path, memory_map=True)
+        return (
+            decode_sheet(pa.Table.from_batches([batch], schema=parquet.schema_arrow))
+            for batch in parquet.iter_batches(batch_size=chunk_rows)
+        )
+
+    def write(self, key, df):
+        """
+        Store a parsed sheet under key.
+
+        Returns False, leaving the cache unchanged, if the sheet holds values
+        that cannot be stored (e.g. dates mixed with text in one column).
+        """
+        try:
+            table = encode_sheet(df)
+        except (TypeError, ValueError, pa.ArrowException):
+            return False
+        path = self.path(key)
+        # Write to a temporary file first so an interrupted run leaves no partial cache file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, path)
+        return True
@@ -0,0 +1,87 @@
+"""
+Text normalization engine behind keeco_scraper.clean_text.
+
+ftfy and NFKC normalization are only run when a string could need them:
+plain ASCII without HTML entities or control characters takes a fast path
+that just collapses whitespace. Results for short strings are memoized in a
+bounded LRU cache, since detail values such as Care, Origin and Warranties
+repeat across nearly every product.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+# A run of whitespace and/or trademark symbols: removing the symbols and then
+# collapsing whitespace leaves " " if the run had any whitespace, else ""
+SYMBOL_OR_SPACE_RUN = re.compile(r"(?:\s|[®™©])+")
+# ASCII control characters that ftfy strips (everything but \t \n \r)
+CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+
+def _collapse(match):
+    return " " if match.group(0).strip("®™©") else ""
+
+
+class TextNormalizer:
+    """Callable clean_text implementation with an ASCII fast path and an LRU memo."""
+
+    def __init__(self, memo_size=4096, memo_max_length=512):
+        self.memo_max_length = memo_max_length
+        self._memo = lru_cache(maxsize=memo_size)(self._normalize)
+        self.fast_path = 0
+        self.full_path = 0
+
+    def __call__(self, text):
+        if not isinstance(text, str):
+            return ""  # Return empty string for non-string inputs
+        if len(text) <= self.memo_max_length:
+            return self._memo(text)
+        return self._normalize(text)
+
+    def _normalize(self, text):
+        if text.isascii() and "&" not in text and not CONTROL_CHARS.search(text):
+            # Nothing for ftfy, NFKC or the symbol/mojibake rules to change
+            self.fast_path += 1
+            return " ".join(text.split())
+
+        self.full_path += 1
+        # ftfy is imported on the first string that needs it, which keeps
+        # importing the cleaning modules cheap for worker processes
+        from ftfy import fix_text
+
+        text = fix_text(text)  # Fix text encoding issues
+        text = unicodedata.normalize("NFKC", text)  # Normalize Unicode (also maps NBSP to a space)
+        text = SYMBOL_OR_SPACE_RUN.sub(_collapse, text)  # Drop trademark symbols, normalize whitespace
+        text = text.replace("â€", "-")  # Replace specific encoding issue with dash
+        return text.strip()
+
+    def stats(self):
+        info = self._memo.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "memo_hits": info.hits,
+            "memo_misses": info.misses,
+            "memo_size": info.currsize,
+            "memo_hit_rate": info.hits / lookups if lookups else 0.0,
+            "fast_path": self.fast_path,
+            "full_path": self.full_path,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"clean_text: {stats['memo_hit_rate']:.1%} memo hit rate "
+                f"({stats['memo_hits']} hits, {stats['memo_misses']} misses), "
+                f"{stats['fast_path']} ASCII fast path, {stats['full_path']} full normalizations")
+
+    def clear(self):
+        self._memo.cache_clear()
+        self.fast_path = 0
+        self.full_path = 0
+
+
+normalizer = TextNormalizer()
+
+
+def clean_text(text):
+    """Clean up text by fixing encoding issues and normalizing."""
+    return normalizer(text)
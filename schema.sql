@@ -11,10 +11,14 @@ CREATE TABLE IF NOT EXISTS manufactured.keeco (
 	price_per_unit DECIMAL(10,2),
 	units_per_case INTEGER,
 	specs JSONB,
+	row_hash CHAR(32),
 	created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
 	updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Hash of the loaded values, so upserts only touch rows whose content changed
+ALTER TABLE manufactured.keeco ADD COLUMN IF NOT EXISTS row_hash CHAR(32);
+
 -- Create index on SKU for faster lookups
 CREATE INDEX IF NOT EXISTS idx_keeco_sku ON manufactured.keeco(sku);
 